@@ -12,6 +12,7 @@
 输入 → 预处理 → 脚本分段 → 固定短语提取(span) → 
 各段分词 → 短语合并 → 标签标注 → [AI增强] → 输出
 """
+import re
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 
@@ -23,6 +24,10 @@ from core.enhanced_tagger import EnhancedTagger, TagResult
 from core.tokenizers import ChineseTokenizer, JapaneseTokenizer, EuropeanTokenizer
 
 
+# 锁定掩码中连续的未锁定位置
+_UNLOCKED_RUN = re.compile(rb'\x00+')
+
+
 @dataclass
 class ProcessedToken:
     """处理后的 token"""
@@ -116,15 +121,14 @@ class EnhancedPipeline:
         # 先添加固定短语（按位置）
         span_tokens = [(span.start, span.text, span.tag, span.confidence) for span in spans]
         
+        # 锁定区间转为逐字符掩码，各段只需在掩码上找未锁定的连续区间
+        locked_mask = self._build_locked_mask(len(cleaned), locked_ranges)
+        
         # 对未锁定的段进行分词
         for segment in segments:
-            # 检查这段是否完全在锁定区间内
-            if self._is_fully_locked(segment.start, segment.end, locked_ranges):
-                continue
-            
-            # 获取这段中未锁定的部分
+            # 获取这段中未锁定的部分（完全锁定的段没有未锁定部分）
             unlocked_parts = self._get_unlocked_parts(
-                segment.text, segment.start, locked_ranges
+                cleaned, segment.start, segment.end, locked_mask
             )
             
             for part_start, part_end, part_text in unlocked_parts:
@@ -253,56 +257,29 @@ class EnhancedPipeline:
         
         return results
     
-    def _is_fully_locked(self, start: int, end: int, locked_ranges: List[Tuple[int, int]]) -> bool:
-        """检查区间是否完全被锁定"""
+    def _build_locked_mask(self, length: int, locked_ranges: List[Tuple[int, int]]) -> bytearray:
+        """把锁定区间列表转为逐字符掩码（1 = 已锁定）"""
+        mask = bytearray(length)
         for lock_start, lock_end in locked_ranges:
-            if lock_start <= start and end <= lock_end:
-                return True
-        return False
+            lock_end = min(lock_end, length)
+            if lock_start < lock_end:
+                mask[lock_start:lock_end] = b'\x01' * (lock_end - lock_start)
+        return mask
     
     def _get_unlocked_parts(
         self, 
         text: str, 
-        text_start: int, 
-        locked_ranges: List[Tuple[int, int]]
+        start: int, 
+        end: int,
+        locked_mask: bytearray
     ) -> List[Tuple[int, int, str]]:
-        """获取文本中未锁定的部分"""
-        # 转换锁定区间到相对于 text_start 的位置
-        relative_locks = []
-        for lock_start, lock_end in locked_ranges:
-            # 计算与当前段的交集
-            rel_start = max(0, lock_start - text_start)
-            rel_end = min(len(text), lock_end - text_start)
-            if rel_start < rel_end:
-                relative_locks.append((rel_start, rel_end))
-        
-        if not relative_locks:
-            return [(text_start, text_start + len(text), text)]
-        
-        # 合并重叠的锁定区间
-        relative_locks.sort()
-        merged_locks = [relative_locks[0]]
-        for start, end in relative_locks[1:]:
-            if start <= merged_locks[-1][1]:
-                merged_locks[-1] = (merged_locks[-1][0], max(merged_locks[-1][1], end))
-            else:
-                merged_locks.append((start, end))
-        
-        # 获取未锁定部分
-        parts = []
-        prev_end = 0
-        
-        for lock_start, lock_end in merged_locks:
-            if prev_end < lock_start:
-                part_text = text[prev_end:lock_start]
-                parts.append((text_start + prev_end, text_start + lock_start, part_text))
-            prev_end = lock_end
-        
-        if prev_end < len(text):
-            part_text = text[prev_end:]
-            parts.append((text_start + prev_end, text_start + len(text), part_text))
-        
-        return parts
+        """获取 text[start:end] 中未锁定的部分"""
+        return [
+            (part_start, part_end, text[part_start:part_end])
+            for part_start, part_end in (
+                match.span() for match in _UNLOCKED_RUN.finditer(locked_mask, start, end)
+            )
+        ]
     
     def _format_output(self, original: str, tokens: List[str], tag_results: List[TagResult]) -> Dict:
         """格式化输出结果"""
@@ -329,11 +306,32 @@ class EnhancedPipeline:
             "tag_summary": tag_summary
         }
     
-    async def process_batch(self, keywords: List[str]) -> List[Dict]:
-        """批量处理"""
+    async def process_batch(
+        self,
+        keywords: List[str],
+        languages: Optional[List[Optional[str]]] = None,
+        return_exceptions: bool = False
+    ) -> List[Dict]:
+        """
+        批量处理
+        
+        Args:
+            keywords: 关键词列表
+            languages: 与 keywords 一一对应的语言代码（可选）
+            return_exceptions: 为 True 时单个关键词失败不中断整批，
+                异常对象放在对应位置返回（同 asyncio.gather）
+        """
+        if languages is None:
+            languages = [None] * len(keywords)
+        
         results = []
-        for keyword in keywords:
-            result = await self.process(keyword)
+        for keyword, language in zip(keywords, languages):
+            try:
+                result = await self.process(keyword, language=language)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                result = e
             results.append(result)
         return results
 
@@ -8,10 +8,41 @@
 
 实现：在 token 序列上跑 phrase matcher，识别并合并固定搭配
 """
-from typing import List, Dict, Set, Tuple, Optional
+import re
+import sys
+from typing import List, Dict, Set, Tuple, Optional, Iterator
 from dataclasses import dataclass
 
 
+# 超过该长度的 token 不做 intern，避免 intern 表无限增长
+_INTERN_MAX_LEN = 32
+
+
+def _intern_lower(token: str) -> str:
+    """小写化并 intern 常见短 token，使短语字典查找可按指针比较"""
+    lowered = token.lower()
+    if len(lowered) <= _INTERN_MAX_LEN:
+        return sys.intern(lowered)
+    return lowered
+
+
+def _trie_to_pattern(node: Dict) -> str:
+    """把字符前缀树转换为正则（结束标记为空字符串 key）"""
+    terminal = "" in node
+    branches = [
+        re.escape(char) + _trie_to_pattern(child)
+        for char, child in node.items()
+        if char != ""
+    ]
+    if not branches:
+        return ""
+    if len(branches) == 1 and not terminal:
+        return branches[0]
+    pattern = "(?:" + "|".join(branches) + ")"
+    # 可结束的节点：贪婪可选，优先尝试更长的短语
+    return pattern + "?" if terminal else pattern
+
+
 @dataclass
 class MergedToken:
     """合并后的 token"""
@@ -38,6 +69,10 @@ class PhraseMerger:
         # 最大短语长度（用于优化搜索）
         self.max_phrase_len = 1
         
+        # ASCII 短语的正则快速路径（短语变化后在下次 merge 时重建）
+        self._ascii_phrase_re: Optional[re.Pattern] = None
+        self._ascii_phrase_re_dirty = True
+        
         # 加载预设短语
         self._load_default_phrases()
     
@@ -357,9 +392,10 @@ class PhraseMerger:
     
     def add_phrase(self, tokens: Tuple[str, ...], tag: str, confidence: float = 0.9):
         """添加固定短语"""
-        # 标准化为小写
-        normalized = tuple(t.lower() for t in tokens)
+        # 标准化为小写（并 intern，与 merge 时的查找 key 共享同一对象）
+        normalized = tuple(_intern_lower(t) for t in tokens)
         self.phrases[normalized] = (tag, confidence)
+        self._ascii_phrase_re_dirty = True
         
         # 更新最大长度
         if len(normalized) > self.max_phrase_len:
@@ -381,12 +417,49 @@ class PhraseMerger:
         Returns:
             合并后的 MergedToken 列表
         """
-        if not tokens:
-            return []
+        return list(self._merge_iter(tokens))
+    
+    def _build_ascii_phrase_re(self) -> Optional[re.Pattern]:
+        """
+        把所有纯 ASCII 短语编译成一个正则
+        
+        短语先按字符组织成前缀树再生成正则（公共前缀只匹配一次），
+        每个节点优先尝试更长的延续，配合前后断言只在 token 边界匹配，
+        因此 finditer 的结果与逐位置最长匹配一致
+        """
+        trie: Dict = {}
+        for phrase in self.phrases:
+            if phrase and all(t and t.isascii() and " " not in t for t in phrase):
+                node = trie
+                for char in " ".join(phrase):
+                    node = node.setdefault(char, {})
+                node[""] = {}  # 结束标记
+        if not trie:
+            return None
+        pattern = _trie_to_pattern(trie)
+        return re.compile(r"(?<![^ ])" + pattern + r"(?![^ ])", re.IGNORECASE | re.ASCII)
+    
+    def _merge_iter(self, tokens: List[str]) -> Iterator[MergedToken]:
+        """
+        逐个产出合并结果（merge 的生成器版本）
+        
+        只需遍历一次结果的调用方直接消费该生成器，避免构建中间列表
+        """
+        if self._ascii_phrase_re_dirty:
+            self._ascii_phrase_re = self._build_ascii_phrase_re()
+            self._ascii_phrase_re_dirty = False
+        
+        # 快速路径：纯 ASCII 输入只可能命中 ASCII 短语，用一次正则扫描完成匹配
+        if self._ascii_phrase_re is not None:
+            joined = " ".join(tokens)
+            if joined.isascii() and all(t and " " not in t for t in tokens):
+                yield from self._merge_ascii(tokens, joined)
+                return
         
-        result = []
         i = 0
         n = len(tokens)
+        # 每个 token 只小写一次
+        lowered = [_intern_lower(t) for t in tokens]
         
         while i < n:
             # 尝试匹配最长的短语
@@ -394,14 +467,14 @@ class PhraseMerger:
             
             # 从最长可能的短语长度开始尝试
             for phrase_len in range(min(self.max_phrase_len, n - i), 0, -1):
-                candidate = tuple(t.lower() for t in tokens[i:i + phrase_len])
+                candidate = tuple(lowered[i:i + phrase_len])
                 
                 if candidate in self.phrases:
                     tag, confidence = self.phrases[candidate]
                     
                     # 创建合并后的 token
                     merged_text = " ".join(tokens[i:i + phrase_len])
-                    result.append(MergedToken(
+                    yield MergedToken(
                         text=merged_text,
                         original_tokens=tokens[i:i + phrase_len],
                         start_idx=i,
@@ -409,7 +482,7 @@ class PhraseMerger:
                         is_merged=(phrase_len > 1),
                         suggested_tag=tag,
                         confidence=confidence
-                    ))
+                    )
                     
                     i += phrase_len
                     matched = True
@@ -417,21 +490,61 @@ class PhraseMerger:
             
             if not matched:
                 # 没有匹配到短语，保留原始 token
-                result.append(MergedToken(
+                yield MergedToken(
                     text=tokens[i],
                     original_tokens=[tokens[i]],
                     start_idx=i,
                     end_idx=i + 1,
                     is_merged=False
-                ))
+                )
                 i += 1
+    
+    def _merge_ascii(self, tokens: List[str], joined: str) -> Iterator[MergedToken]:
+        """正则快速路径：joined 为 tokens 以单个空格拼接的结果"""
+        i = 0
+        pos = 0  # tokens[i] 在 joined 中的起始字符位置
+        for m in self._ascii_phrase_re.finditer(joined):
+            # 两次匹配之间的空格数即为跳过的 token 数
+            match_start = i + joined.count(" ", pos, m.start())
+            while i < match_start:
+                yield MergedToken(
+                    text=tokens[i],
+                    original_tokens=[tokens[i]],
+                    start_idx=i,
+                    end_idx=i + 1,
+                    is_merged=False
+                )
+                i += 1
+            
+            phrase_len = m.group().count(" ") + 1
+            tag, confidence = self.phrases[tuple(
+                _intern_lower(t) for t in tokens[i:i + phrase_len]
+            )]
+            yield MergedToken(
+                text=m.group(),
+                original_tokens=tokens[i:i + phrase_len],
+                start_idx=i,
+                end_idx=i + phrase_len,
+                is_merged=(phrase_len > 1),
+                suggested_tag=tag,
+                confidence=confidence
+            )
+            i += phrase_len
+            pos = m.end() + 1
         
-        return result
+        while i < len(tokens):
+            yield MergedToken(
+                text=tokens[i],
+                original_tokens=[tokens[i]],
+                start_idx=i,
+                end_idx=i + 1,
+                is_merged=False
+            )
+            i += 1
     
     def merge_to_strings(self, tokens: List[str]) -> List[str]:
         """便捷方法：直接返回合并后的字符串列表"""
-        merged = self.merge(tokens)
-        return [m.text for m in merged]
+        return [m.text for m in self._merge_iter(tokens)]
     
     def get_suggested_tags(self, tokens: List[str]) -> Dict[str, Tuple[str, float]]:
         """
@@ -440,10 +553,9 @@ class PhraseMerger:
         Returns:
             {token: (tag, confidence)}
         """
-        merged = self.merge(tokens)
         return {
             m.text: (m.suggested_tag, m.confidence)
-            for m in merged
+            for m in self._merge_iter(tokens)
             if m.suggested_tag is not None
         }
 
@@ -23,6 +23,10 @@ class ScriptType(Enum):
     OTHER = "other"       # 其他
 
 
+# 可以相互合并的脚本类型（Latin + Number + 标点，如 "10.5cm"）
+_MERGEABLE_SCRIPTS = frozenset({ScriptType.LATIN, ScriptType.NUMBER, ScriptType.PUNCT})
+
+
 class Segment(NamedTuple):
     """分段结果"""
     text: str
@@ -70,9 +74,9 @@ class ScriptSegmenter:
             return []
         
         segments = []
-        current_text = ""
-        current_script = None
+        current_script = None  # None 表示当前没有累积的段
         current_start = 0
+        is_mergeable = _MERGEABLE_SCRIPTS.__contains__
         
         for i, char in enumerate(text):
             char_script = self._get_script_type(char)
@@ -80,14 +84,8 @@ class ScriptSegmenter:
             # 空格特殊处理：根据上下文决定归属
             if char_script == ScriptType.SPACE:
                 # 如果当前有累积的段，先保存
-                if current_text.strip():
-                    segments.append(Segment(
-                        text=current_text,
-                        script=current_script,
-                        start=current_start,
-                        end=i
-                    ))
-                    current_text = ""
+                if current_script is not None:
+                    segments.append(Segment(text[current_start:i], current_script, current_start, i))
                     current_script = None
                 # 跳过空格，重置起始位置
                 current_start = i + 1
@@ -98,38 +96,23 @@ class ScriptSegmenter:
                 # 检查是否应该合并（Latin + Number 或 Number + Latin）
                 should_merge = (
                     self.merge_adjacent_latin and
-                    self._can_merge(current_script, char_script)
+                    is_mergeable(current_script) and
+                    is_mergeable(char_script)
                 )
                 
                 if not should_merge:
-                    if current_text.strip():
-                        segments.append(Segment(
-                            text=current_text,
-                            script=current_script,
-                            start=current_start,
-                            end=i
-                        ))
-                    current_text = char
+                    segments.append(Segment(text[current_start:i], current_script, current_start, i))
                     current_script = char_script
                     current_start = i
-                else:
+                elif current_script == ScriptType.NUMBER:
                     # 合并，保持 Latin 类型
-                    current_text += char
-                    if current_script == ScriptType.NUMBER:
-                        current_script = ScriptType.LATIN
-            else:
-                current_text += char
-                if current_script is None:
-                    current_script = char_script
+                    current_script = ScriptType.LATIN
+            elif current_script is None:
+                current_script = char_script
         
         # 保存最后一段
-        if current_text.strip():
-            segments.append(Segment(
-                text=current_text,
-                script=current_script,
-                start=current_start,
-                end=len(text)
-            ))
+        if current_script is not None:
+            segments.append(Segment(text[current_start:], current_script, current_start, len(text)))
         
         # 后处理：合并可以合并的段
         segments = self._post_merge(segments)
@@ -217,8 +200,7 @@ class ScriptSegmenter:
     
     def _can_merge(self, script1: ScriptType, script2: ScriptType) -> bool:
         """判断两种脚本类型是否可以合并"""
-        mergeable = {ScriptType.LATIN, ScriptType.NUMBER, ScriptType.PUNCT}
-        return script1 in mergeable and script2 in mergeable
+        return script1 in _MERGEABLE_SCRIPTS and script2 in _MERGEABLE_SCRIPTS
     
     def _post_merge(self, segments: List[Segment]) -> List[Segment]:
         """后处理：合并相邻的可合并段"""
@@ -234,7 +216,7 @@ class ScriptSegmenter:
                 # 检查是否相邻（允许小间隔）
                 gap = next_seg.start - current.end
                 if gap <= 1:
-                    # 合并
+                    # 合并（间隔的空白字符统一规范为一个空格）
                     current = Segment(
                         text=current.text + (" " * gap) + next_seg.text,
                         script=ScriptType.LATIN,  # 合并后统一为 LATIN
@@ -11,11 +11,65 @@
 - 输出 span 列表而不是替换字符串
 - 支持边界感知匹配（token boundary / word boundary）
 """
-from typing import List, Dict, Set, Tuple, Optional, NamedTuple
+from typing import Callable, List, Dict, Set, Tuple, Optional, NamedTuple
 from dataclasses import dataclass
 from enum import Enum
+from operator import attrgetter, itemgetter
+from types import MappingProxyType
+import heapq
+from itertools import chain
 import re
 
+# Aho-Corasick 自动机（可选，未安装时退化为逐位置 Trie 匹配）
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+# 字节 → 是否为 ASCII 字母/数字（1/0），配合 bytes.translate 一次性生成边界掩码
+_ASCII_ALNUM_TABLE = bytes(
+    1 if chr(b).isascii() and chr(b).isalnum() else 0 for b in range(256)
+)
+
+
+def _ascii_alnum_mask(text: str) -> bytes:
+    """
+    生成与 text 逐字符对应的掩码：ASCII 字母/数字为 1，其余为 0
+    
+    latin-1 以外的字符被替换为 '?'（仍是一字符一字节），本来就不算 ASCII 字母数字
+    """
+    return text.encode('latin-1', 'replace').translate(_ASCII_ALNUM_TABLE)
+
+
+# 连续的 CJK 字符（与 _is_cjk_char 的范围一致：汉字 + 平假名 + 片假名）
+_CJK_RUN_PATTERN = re.compile(r'[\u4e00-\u9fff\u3040-\u30ff]+')
+
+
+def _cjk_char_mask(text: str) -> bytearray:
+    """生成与 text 逐字符对应的掩码：CJK 字符为 1，其余为 0"""
+    mask = bytearray(len(text))
+    for match in _CJK_RUN_PATTERN.finditer(text):
+        start, end = match.span()
+        mask[start:end] = b'\x01' * (end - start)
+    return mask
+
+
+# 数字+单位模式
+# - (?<!\d)：只从数字串开头尝试匹配，避免长数字串（SKU、条码）在每个位置重复回溯
+# - 单位按首字符合并：单字单位并入字符类，m/mm、l/lb 合并为 mm?、lb?；
+#   原分支列表中被更早分支遮蔽的 ml、GB、MB 等（IGNORECASE 下 m/g 先命中）已省略，匹配结果不变
+_NUMBER_UNIT_PATTERN = re.compile(
+    r'(?<!\d)(\d+\.?\d*)\s*'
+    r'([码寸号磅克升张片个只条支瓶盒包袋件套双对]|'
+    r'cm|mm?|inch|英寸|厘米|'
+    r'kg|g|lb?|千克|毫升|tb)',
+    re.IGNORECASE
+)
+
+# 预检：不含数字的文本（多数关键词）不必跑完整的数字+单位正则
+_DIGIT_PATTERN = re.compile(r'\d')
+
 
 class SpanType(Enum):
     """Span 类型"""
@@ -28,6 +82,8 @@ class SpanType(Enum):
 @dataclass
 class Span:
     """表示文本中的一个区间"""
+    __slots__ = ('start', 'end', 'text', 'span_type', 'tag', 'confidence')
+    
     start: int
     end: int
     text: str
@@ -40,20 +96,46 @@ class Span:
         return self.end - self.start
 
 
-class TrieNode:
-    """Trie 树节点"""
-    def __init__(self):
-        self.children: Dict[str, 'TrieNode'] = {}
-        self.is_end: bool = False
-        self.data: Optional[Dict] = None  # 存储匹配到的词条信息
+# 词条数据池：相同 (tag, confidence, type) 的词条共享同一个只读映射
+_DATA_POOL: Dict[Tuple[str, float, SpanType], MappingProxyType] = {}
+
+
+def _intern_data(tag: str, confidence: float, span_type: SpanType) -> MappingProxyType:
+    """返回共享的只读词条数据（大量品牌词的标签/置信度相同）"""
+    key = (tag, confidence, span_type)
+    data = _DATA_POOL.get(key)
+    if data is None:
+        data = MappingProxyType({
+            "tag": tag,
+            "confidence": confidence,
+            "type": span_type
+        })
+        _DATA_POOL[key] = data
+    return data
 
 
 class Trie:
-    """Trie 树，用于高效的最长前缀匹配"""
+    """
+    Trie 树，用于高效的最长前缀匹配
+    
+    采用 Patricia（压缩前缀树）结构：只有一个子节点的非词尾节点并入边，
+    边上携带字符串标签，品牌名的长尾后缀一次比较即可走完。
+    节点用整数 id 表示，按 id 存在平行列表中（根节点 id 为 0）：
+    - _children[id]: {边的首字符: (边的剩余标签, 子节点 id)}
+    - _data[id]: 词条数据，非词尾节点为 None
+    """
     
     def __init__(self, case_sensitive: bool = False):
-        self.root = TrieNode()
+        self._children: List[Dict[str, Tuple[str, int]]] = [{}]
+        self._data: List[Optional[Dict]] = [None]
         self.case_sensitive = case_sensitive
+        
+        # 与 Trie 同步维护的 Aho-Corasick 自动机（需要 pyahocorasick）
+        self._automaton = (
+            ahocorasick.Automaton(ahocorasick.STORE_ANY, ahocorasick.KEY_STRING)
+            if ahocorasick is not None else None
+        )
+        self._automaton_ready = False
     
     def _normalize(self, text: str) -> str:
         """标准化文本"""
@@ -64,47 +146,139 @@ class Trie:
     def insert(self, word: str, data: Dict = None):
         """插入词条"""
         word = self._normalize(word)
-        node = self.root
+        node_id = 0
+        i = 0
+        
+        while i < len(word):
+            children = self._children[node_id]
+            edge = children.get(word[i])
+            
+            if edge is None:
+                # 没有可走的边：剩余部分整体作为一条新边连到新的叶子节点
+                node_id = len(self._children)
+                self._children.append({})
+                self._data.append(None)
+                children[word[i]] = (word[i + 1:], node_id)
+                break
+            
+            label, child_id = edge
+            rest_start = i + 1
+            common = 0
+            while (common < len(label) and rest_start + common < len(word)
+                   and label[common] == word[rest_start + common]):
+                common += 1
+            
+            if common < len(label):
+                # 词在边的中间分叉或结束：在分叉处拆出中间节点
+                mid = len(self._children)
+                self._children.append({label[common]: (label[common + 1:], child_id)})
+                self._data.append(None)
+                children[word[i]] = (label[:common], mid)
+                child_id = mid
+            
+            node_id = child_id
+            i = rest_start + common
         
-        for char in word:
-            if char not in node.children:
-                node.children[char] = TrieNode()
-            node = node.children[char]
+        data = data or {}
+        self._data[node_id] = data
         
-        node.is_end = True
-        node.data = data or {}
+        if self._automaton is not None and word:
+            self._automaton.add_word(word, (len(word), data))
+            self._automaton_ready = False
     
-    def search_longest(self, text: str, start: int = 0) -> Optional[Tuple[str, int, Dict]]:
+    def search_longest(
+        self, text: str, start: int = 0, normalized: bool = False
+    ) -> Optional[Tuple[str, int, Dict]]:
         """
         从指定位置开始，查找最长匹配
         
+        Args:
+            normalized: text 是否已经标准化（如已小写），是则不再重复处理
+        
         Returns:
             (匹配的词, 结束位置, 词条数据) 或 None
         """
-        text_normalized = self._normalize(text)
-        node = self.root
-        
+        text_normalized = text if normalized else self._normalize(text)
+        result = self._walk_longest(text_normalized, start)
+        if result:
+            end_pos, data = result
+            return (text[start:end_pos], end_pos, data)
+        return None
+    
+    def _walk_longest(self, text_normalized: str, start: int) -> Optional[Tuple[int, Dict]]:
+        """从 start 沿 Trie 向下走，返回最长匹配的 (结束位置, 词条数据)"""
+        all_children = self._children
+        all_data = self._data
+        children = all_children[0]
         last_match = None
-        last_match_pos = start
-        last_match_data = None
+        i = start
+        n = len(text_normalized)
         
-        for i in range(start, len(text_normalized)):
-            char = text_normalized[i]
-            
-            if char not in node.children:
+        while i < n:
+            edge = children.get(text_normalized[i])
+            if edge is None:
                 break
-            
-            node = node.children[char]
-            
-            if node.is_end:
-                # 记录当前匹配
-                last_match = text[start:i+1]
-                last_match_pos = i + 1
-                last_match_data = node.data
-        
-        if last_match:
-            return (last_match, last_match_pos, last_match_data)
-        return None
+            label, node_id = edge
+            # 边标签整体比较（C 层完成，不逐字符走节点）
+            if label and not text_normalized.startswith(label, i + 1):
+                break
+            i += 1 + len(label)
+            data = all_data[node_id]
+            if data is not None:
+                last_match = (i, data)
+            children = all_children[node_id]
+        
+        return last_match
+    
+    def longest_matches(
+        self, text: str, normalized: bool = False
+    ) -> Optional[Dict[int, Tuple[int, Dict]]]:
+        """
+        用 Aho-Corasick 自动机单遍扫描全文，算出每个起点的最长匹配
+        
+        Args:
+            normalized: text 是否已经标准化，是则不再重复处理
+        
+        Returns:
+            {起始位置: (结束位置, 词条数据)}；未安装 pyahocorasick 时返回 None
+        """
+        if self._automaton is None:
+            return None
+        
+        longest: Dict[int, Tuple[int, Dict]] = {}
+        if not self._automaton_ready:
+            if len(self._automaton) == 0:
+                return longest
+            self._automaton.make_automaton()
+            self._automaton_ready = True
+        
+        if not normalized:
+            text = self._normalize(text)
+        for end_idx, (length, data) in self._automaton.iter(text):
+            start = end_idx - length + 1
+            end = end_idx + 1
+            if start not in longest or longest[start][0] < end:
+                longest[start] = (end, data)
+        return longest
+    
+    def longest_matcher(
+        self, text: str, normalized: bool = False
+    ) -> Callable[[int], Optional[Tuple[int, Dict]]]:
+        """
+        为整段文本准备最长匹配查询函数 lookup(start) -> (结束位置, 词条数据) | None
+        
+        有 pyahocorasick 时直接查 longest_matches 的结果；
+        否则文本只标准化一次，按需逐位置走 Trie
+        
+        Args:
+            normalized: text 是否已经标准化，是则不再重复处理
+        """
+        text_normalized = text if normalized else self._normalize(text)
+        longest = self.longest_matches(text_normalized, normalized=True)
+        if longest is not None:
+            return longest.get
+        
+        return lambda start: self._walk_longest(text_normalized, start)
 
 
 class SpanPhraseExtractor:
@@ -125,16 +299,8 @@ class SpanPhraseExtractor:
         self.cjk_trie = Trie(case_sensitive=False)
         self.latin_trie = Trie(case_sensitive=False)
         
-        # 编译正则模式：数字+单位
-        self.number_unit_pattern = re.compile(
-            r'(\d+\.?\d*)\s*'
-            r'(码|寸|号|cm|mm|m|inch|英寸|厘米|'
-            r'kg|g|lb|磅|克|千克|'
-            r'ml|l|毫升|升|'
-            r'GB|TB|MB|gb|tb|mb|'
-            r'张|片|个|只|条|支|瓶|盒|包|袋|件|套|双|对)',
-            re.IGNORECASE
-        )
+        # 正则模式：数字+单位（模块级预编译，所有实例共享）
+        self.number_unit_pattern = _NUMBER_UNIT_PATTERN
         
         if dictionary_manager:
             self._load_from_dictionary()
@@ -145,34 +311,24 @@ class SpanPhraseExtractor:
         brands = self.dict_manager.get_entries("brands")
         for entry in brands:
             word = entry.get("word", "")
+            data = _intern_data("品牌词", entry.get("confidence", 0.95), SpanType.BRAND)
             if self._is_cjk_dominant(word):
-                self.cjk_trie.insert(word, {
-                    "tag": "品牌词",
-                    "confidence": entry.get("confidence", 0.95),
-                    "type": SpanType.BRAND
-                })
+                self.cjk_trie.insert(word, data)
             else:
-                self.latin_trie.insert(word, {
-                    "tag": "品牌词",
-                    "confidence": entry.get("confidence", 0.95),
-                    "type": SpanType.BRAND
-                })
+                self.latin_trie.insert(word, data)
         
         # 可以加载更多类型的固定短语...
     
     def _is_cjk_dominant(self, text: str) -> bool:
         """判断文本是否以 CJK 字符为主"""
-        cjk_count = sum(1 for c in text if '\u4e00' <= c <= '\u9fff' or '\u3040' <= c <= '\u30ff')
+        # 删掉 CJK 字符后的长度差即 CJK 字符数（C 层完成，不逐字符比较）
+        cjk_count = len(text) - len(_CJK_RUN_PATTERN.sub('', text))
         return cjk_count > len(text) / 2
     
     def add_phrase(self, phrase: str, tag: str, confidence: float = 0.95, 
                    span_type: SpanType = SpanType.FIXED_PHRASE):
         """添加固定短语"""
-        data = {
-            "tag": tag,
-            "confidence": confidence,
-            "type": span_type
-        }
+        data = _intern_data(tag, confidence, span_type)
         
         if self._is_cjk_dominant(phrase):
             self.cjk_trie.insert(phrase, data)
@@ -191,55 +347,86 @@ class SpanPhraseExtractor:
             (spans: 提取出的固定短语 span 列表,
              locked_ranges: 被锁定的区间列表，后续分词应跳过这些区间)
         """
-        spans = []
-        locked_ranges = []
+        # 数字+单位与短语两趟各自按起点递增产生，最后归并即可保持有序
+        number_spans = []
+        number_ranges = []
+        # 逐字符的锁定标记（1 = 已锁定）
+        # 只需标记数字+单位区间：短语匹配成功后扫描位置直接跳到区间末尾
+        locked_mask = bytearray(len(text))
         
         # 1. 提取数字+单位组合
-        for match in self.number_unit_pattern.finditer(text):
+        number_matches = (
+            self.number_unit_pattern.finditer(text)
+            if _DIGIT_PATTERN.search(text) else ()
+        )
+        for match in number_matches:
+            start, end = match.span()
             span = Span(
-                start=match.start(),
-                end=match.end(),
+                start=start,
+                end=end,
                 text=match.group(),
                 span_type=SpanType.NUMBER_UNIT,
                 tag="尺寸词",
                 confidence=0.95
             )
-            spans.append(span)
-            locked_ranges.append((match.start(), match.end()))
+            number_spans.append(span)
+            number_ranges.append((start, end))
+            locked_mask[start:end] = b'\x01' * (end - start)
         
         # 2. 提取品牌和固定短语
+        # 先一次性算出每个位置的最长匹配，再按原逻辑从左到右贪心选取
         text_lower = text.lower()
-        i = 0
+        # 两棵 Trie 都不区分大小写，直接复用 text_lower，不再各自重复小写化
+        cjk_matches = self.cjk_trie.longest_matches(text_lower, normalized=True)
+        latin_matches = self.latin_trie.longest_matches(text_lower, normalized=True)
         
-        while i < len(text):
+        if cjk_matches is not None and latin_matches is not None:
+            # 自动机已给出全部匹配起点，只需访问这些位置
+            cjk_lookup = cjk_matches.get
+            latin_lookup = latin_matches.get
+            candidates = sorted(cjk_matches.keys() | latin_matches.keys())
+        else:
+            cjk_lookup = self.cjk_trie.longest_matcher(text_lower, normalized=True)
+            latin_lookup = self.latin_trie.longest_matcher(text_lower, normalized=True)
+            candidates = range(len(text))
+        
+        alnum_mask = _ascii_alnum_mask(text_lower)
+        cjk_mask = _cjk_char_mask(text)
+        phrase_spans = []
+        phrase_ranges = []
+        next_free = 0  # 上一个匹配的结束位置，之前的位置不再尝试
+        
+        for i in candidates:
+            if i < next_free:
+                continue
+            if i >= len(text):
+                break
             # 检查是否在已锁定区间内
-            if self._is_in_locked_range(i, locked_ranges):
-                i += 1
+            if locked_mask[i]:
                 continue
             
             # 判断当前位置的字符类型
-            char = text[i]
-            
-            if self._is_cjk_char(char):
+            if cjk_mask[i]:
                 # CJK 字符：使用 CJK Trie 匹配
-                result = self.cjk_trie.search_longest(text, i)
+                result = cjk_lookup(i)
                 if result:
-                    matched_text, end_pos, data = result
+                    end_pos, data = result
                     span = Span(
                         start=i,
                         end=end_pos,
-                        text=matched_text,
+                        text=text[i:end_pos],
                         span_type=data.get("type", SpanType.FIXED_PHRASE),
                         tag=data.get("tag", "属性词"),
                         confidence=data.get("confidence", 0.9)
                     )
-                    spans.append(span)
-                    locked_ranges.append((i, end_pos))
-                    i = end_pos
-                    continue
+                    phrase_spans.append(span)
+                    phrase_ranges.append((i, end_pos))
+                    next_free = end_pos
             else:
                 # Latin 字符：使用词边界匹配
-                result = self._match_latin_with_boundary(text, text_lower, i)
+                result = self._match_latin_with_boundary(
+                    text, text_lower, i, latin_lookup, alnum_mask
+                )
                 if result:
                     matched_text, end_pos, data = result
                     span = Span(
@@ -250,55 +437,88 @@ class SpanPhraseExtractor:
                         tag=data.get("tag", "属性词"),
                         confidence=data.get("confidence", 0.9)
                     )
-                    spans.append(span)
-                    locked_ranges.append((i, end_pos))
-                    i = end_pos
-                    continue
-            
-            i += 1
+                    phrase_spans.append(span)
+                    phrase_ranges.append((i, end_pos))
+                    next_free = end_pos
         
-        # 3. 按位置排序
-        spans.sort(key=lambda s: s.start)
-        locked_ranges.sort(key=lambda r: r[0])
+        # 3. 按位置归并（两个列表各自已有序）
+        if not number_spans:
+            return phrase_spans, phrase_ranges
+        if not phrase_spans:
+            return number_spans, number_ranges
+        spans = list(heapq.merge(number_spans, phrase_spans, key=attrgetter('start')))
+        locked_ranges = list(heapq.merge(number_ranges, phrase_ranges, key=itemgetter(0)))
         
         return spans, locked_ranges
     
-    def _match_latin_with_boundary(self, text: str, text_lower: str, start: int) -> Optional[Tuple[str, int, Dict]]:
+    def extract_batch(self, texts: List[str]) -> List[Tuple[List[Span], List[Tuple[int, int]]]]:
+        """
+        批量提取固定短语
+        
+        相同的文本只提取一次（批量关键词中重复很常见），
+        重复出现的位置拿到结果列表的副本，Span 对象与首次结果共享。
+        
+        Args:
+            texts: 输入文本列表
+            
+        Returns:
+            与 texts 一一对应的 extract() 结果
+        """
+        cache: Dict[str, Tuple[List[Span], List[Tuple[int, int]]]] = {}
+        results = []
+        for text in texts:
+            cached = cache.get(text)
+            if cached is None:
+                cached = cache[text] = self.extract(text)
+                results.append(cached)
+            else:
+                spans, locked_ranges = cached
+                results.append((list(spans), list(locked_ranges)))
+        return results
+    
+    def _match_latin_with_boundary(
+        self,
+        text: str,
+        text_lower: str,
+        start: int,
+        latin_lookup: Optional[Callable[[int], Optional[Tuple[int, Dict]]]] = None,
+        alnum_mask: Optional[bytes] = None
+    ) -> Optional[Tuple[str, int, Dict]]:
         """
         在词边界处匹配 Latin 短语
         
         解决问题：避免 "one" 匹配到 "someone" 的子串
+        
+        Args:
+            latin_lookup: latin_trie.longest_matcher 返回的查询函数（可选）
+            alnum_mask: _ascii_alnum_mask(text_lower) 的预计算结果（可选）
         """
+        if alnum_mask is None:
+            alnum_mask = _ascii_alnum_mask(text_lower)
+        
         # 检查是否在词边界（只检查 Latin 字符，CJK 是天然边界）
-        if start > 0:
-            prev_char = text_lower[start-1]
-            # 只有前一个字符是 Latin 字母或数字时才算"不在边界"
-            if prev_char.isascii() and prev_char.isalnum():
-                return None
+        # 只有前一个字符是 Latin 字母或数字时才算"不在边界"
+        if start > 0 and alnum_mask[start - 1]:
+            return None
         
-        result = self.latin_trie.search_longest(text_lower, start)
+        if latin_lookup is not None:
+            result = latin_lookup(start)
+        else:
+            # 只取 (结束位置, 词条数据)，匹配文本在确认边界后再切片
+            result = self.latin_trie._walk_longest(text_lower, start)
         if result:
-            matched_text, end_pos, data = result
+            end_pos, data = result
             
             # 检查结束位置是否是词边界（只检查 Latin 字符）
-            if end_pos < len(text):
-                next_char = text_lower[end_pos]
-                # 只有下一个字符是 Latin 字母或数字时才算"不在边界"
-                if next_char.isascii() and next_char.isalnum():
-                    return None
+            # 只有下一个字符是 Latin 字母或数字时才算"不在边界"
+            if end_pos < len(text) and alnum_mask[end_pos]:
+                return None
             
             # 返回原始大小写的文本
             return (text[start:end_pos], end_pos, data)
         
         return None
     
-    def _is_in_locked_range(self, pos: int, locked_ranges: List[Tuple[int, int]]) -> bool:
-        """检查位置是否在已锁定区间内"""
-        for start, end in locked_ranges:
-            if start <= pos < end:
-                return True
-        return False
-    
     def _is_cjk_char(self, char: str) -> bool:
         """判断是否是 CJK 字符"""
         code = ord(char)
@@ -312,24 +532,22 @@ class SpanPhraseExtractor:
         """
         获取未被锁定的文本段
         
+        Args:
+            locked_ranges: 按起点排好序的锁定区间（即 extract 返回的顺序）
+        
         Returns:
             [(start, end, text), ...]
         """
         if not locked_ranges:
             return [(0, len(text), text)]
         
-        segments = []
-        prev_end = 0
-        
-        for start, end in sorted(locked_ranges):
-            if prev_end < start:
-                segments.append((prev_end, start, text[prev_end:start]))
-            prev_end = end
-        
-        if prev_end < len(text):
-            segments.append((prev_end, len(text), text[prev_end:]))
-        
-        return segments
+        # 边界序列 0, s1, e1, s2, e2, ..., len：偶数位到奇数位之间即未锁定段
+        boundaries = [0, *chain.from_iterable(locked_ranges), len(text)]
+        return [
+            (start, end, text[start:end])
+            for start, end in zip(boundaries[::2], boundaries[1::2])
+            if start < end
+        ]
 
 
 # 常用短语预设
@@ -12,13 +12,107 @@
 3. 常见词尾变化规则
 4. 不规则词特殊处理
 """
-from typing import Dict, Set, Optional, List, Tuple
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Set, Optional, List, Tuple
 from dataclasses import dataclass
 
 
+# 不规则复数词
+_IRREGULAR_PLURALS = MappingProxyType({
+    'pies': 'pie',
+    'luces': 'luz',
+    'voces': 'voz',
+    'peces': 'pez',
+    'nueces': 'nuez',
+    'raíces': 'raíz',
+    'lápices': 'lápiz',
+})
+
+# 不应该归一化的词（本身就是有效词）
+_NO_NORMALIZE = frozenset({
+    'plus', 'bus', 'gas', 'as', 'es', 'os',  # 非复数
+    'menos', 'más', 'tras', 'antes',  # 副词/介词
+    'dos', 'tres', 'seis', 'diez',  # 数词
+    'lunes', 'martes', 'miércoles', 'jueves', 'viernes',  # 星期
+    'crisis', 'análisis', 'énfasis', 'tesis', 'síntesis',  # -sis 结尾
+    'virus', 'corpus', 'campus', 'bonus', 'status',  # 拉丁词
+})
+
+# 常见形容词的阳性形式（用于性别归一）
+_ADJECTIVE_MASCULINE = frozenset({
+    # -o/-a 形容词
+    'negro', 'blanco', 'rojo', 'amarillo', 'azul',
+    'largo', 'corto', 'alto', 'bajo', 'ancho', 'estrecho',
+    'nuevo', 'viejo', 'bueno', 'malo', 'bonito', 'feo',
+    'pequeño', 'grande', 'gordo', 'delgado', 'grueso', 'fino',
+    'duro', 'blando', 'suave', 'áspero',
+    'limpio', 'sucio', 'seco', 'mojado', 'húmedo',
+    'frío', 'caliente', 'templado', 'tibio',
+    'rápido', 'lento', 'ligero', 'pesado',
+    'barato', 'caro', 'económico',
+    'eléctrico', 'electrónico', 'digital', 'manual', 'automático',
+    'portátil', 'plegable', 'ajustable', 'lavable', 'impermeable',
+    'inalámbrico', 'bluetooth', 'recargable', 'desechable',
+    'profesional', 'industrial', 'comercial', 'doméstico',
+    'transparente', 'opaco', 'brillante', 'mate',
+    'redondo', 'cuadrado', 'rectangular', 'ovalado',
+    'plástico', 'metálico', 'cerámico', 'textil',
+    'deportivo', 'casual', 'formal', 'elegante',
+    'cómodo', 'ergonómico', 'práctico', 'funcional',
+    'resistente', 'duradero', 'robusto', 'frágil',
+    'moderno', 'clásico', 'vintage', 'retro',
+    'inteligente', 'táctil',
+})
+
+_CONSONANTS = frozenset('bcdfghjklmnpqrstvwxyz')
+_VOWELS = frozenset('aeiouáéíóú')
+
+# 词尾规则表：按词的最后一个字符分组，组内保持原有的尝试顺序
+# 每条规则：(后缀, 替换, 词的最小长度, 后缀前一个字符须属于的集合或 None, 规则名)
+# 复数规则全部以 s 结尾，不以 s 结尾的词无需逐条检查
+_PLURAL_RULES = {
+    's': (
+        ('ces', 'z', 4, None, 'ces→z'),
+        ('iones', 'ión', 6, None, 'iones→ión'),
+        ('es', '', 4, _CONSONANTS, 'es→∅'),
+        ('s', '', 3, _VOWELS, 's→∅'),
+    ),
+}
+
+# 词典中找不到时仍然执行的复数规则（按顺序）
+_UNVERIFIED_PLURAL_RULES = (
+    ('s', '', 3, _VOWELS, 's→∅(unverified)'),
+    ('es', '', 4, _CONSONANTS, 'es→∅(unverified)'),
+)
+
+# 阴性 → 阳性规则
+_MASCULINE_RULES = {
+    'a': (
+        ('a', 'o', 2, None, 'a→o'),
+        ('ora', 'or', 4, None, 'ora→or'),
+        ('esa', 'és', 4, None, 'esa→és'),
+    ),
+    's': (
+        ('as', 'os', 3, None, 'as→os'),
+    ),
+}
+
+
+def _apply_rule(word: str, rule: Tuple) -> Optional[str]:
+    """规则适用时返回替换后的词，否则返回 None"""
+    suffix, replacement, min_len, preceding, _ = rule
+    if len(word) < min_len or not word.endswith(suffix):
+        return None
+    if preceding is not None and word[-len(suffix) - 1] not in preceding:
+        return None
+    return word[:-len(suffix)] + replacement
+
+
 @dataclass
 class NormalizedWord:
     """归一化结果"""
+    __slots__ = ('original', 'normalized', 'changes', 'confidence')
+    
     original: str
     normalized: str
     changes: List[str]  # 应用的变化规则
@@ -35,68 +129,21 @@ class SpanishNormalizer:
     def __init__(self, dictionary: Set[str] = None):
         """
         Args:
-            dictionary: 词典词集合，用于验证归一化结果
+            dictionary: 词典词集合，用于验证归一化结果（复制为 frozenset，
+                之后修改传入的集合不影响本实例，更新词典请用 set_dictionary/add_to_dictionary）
         """
-        self.dictionary = dictionary or set()
-        
-        # 不规则复数词
-        self.irregular_plurals = {
-            'pies': 'pie',
-            'luces': 'luz',
-            'voces': 'voz',
-            'peces': 'pez',
-            'nueces': 'nuez',
-            'raíces': 'raíz',
-            'lápices': 'lápiz',
-        }
-        
-        # 不应该归一化的词（本身就是有效词）
-        self.no_normalize = {
-            'plus', 'bus', 'gas', 'as', 'es', 'os',  # 非复数
-            'menos', 'más', 'tras', 'antes',  # 副词/介词
-            'dos', 'tres', 'seis', 'diez',  # 数词
-            'lunes', 'martes', 'miércoles', 'jueves', 'viernes',  # 星期
-            'crisis', 'análisis', 'énfasis', 'tesis', 'síntesis',  # -sis 结尾
-            'virus', 'corpus', 'campus', 'bonus', 'status',  # 拉丁词
-        }
+        self.dictionary: FrozenSet[str] = frozenset(dictionary or ())
         
-        # 常见形容词的阳性形式（用于性别归一）
-        self.adjective_masculine = {
-            # -o/-a 形容词
-            'negro', 'blanco', 'rojo', 'amarillo', 'azul',
-            'largo', 'corto', 'alto', 'bajo', 'ancho', 'estrecho',
-            'nuevo', 'viejo', 'bueno', 'malo', 'bonito', 'feo',
-            'pequeño', 'grande', 'gordo', 'delgado', 'grueso', 'fino',
-            'duro', 'blando', 'suave', 'áspero',
-            'limpio', 'sucio', 'seco', 'mojado', 'húmedo',
-            'frío', 'caliente', 'templado', 'tibio',
-            'rápido', 'lento', 'ligero', 'pesado',
-            'barato', 'caro', 'económico',
-            'eléctrico', 'electrónico', 'digital', 'manual', 'automático',
-            'portátil', 'plegable', 'ajustable', 'lavable', 'impermeable',
-            'inalámbrico', 'bluetooth', 'recargable', 'desechable',
-            'profesional', 'industrial', 'comercial', 'doméstico',
-            'transparente', 'opaco', 'brillante', 'mate',
-            'redondo', 'cuadrado', 'rectangular', 'ovalado',
-            'plástico', 'metálico', 'cerámico', 'textil',
-            'deportivo', 'casual', 'formal', 'elegante',
-            'cómodo', 'ergonómico', 'práctico', 'funcional',
-            'resistente', 'duradero', 'robusto', 'frágil',
-            'moderno', 'clásico', 'vintage', 'retro',
-            'inteligente', 'táctil',
-        }
+        # 归一化结果缓存：{小写词: (归一化结果, 变化规则, 置信度)}
+        # 归一化结果为 None 表示保留原词（不归一化列表中的词）
+        # 词典变化时清空
+        self._normalize_cache: Dict[str, Tuple[Optional[str], Tuple[str, ...], float]] = {}
+        self._cache_max_size = 65536
         
-        # 词尾变化规则（从最特殊到最通用）
-        self.plural_rules = [
-            # -ces → -z
-            (r'ces$', 'z', 3),
-            # -ies → -í (raramente usado)
-            # -es 后面是辅音 → 去 -es
-            (r'([bcdfghjklmnpqrstvwxyz])es$', r'\1', 2),
-            # -es 后面是元音 → 可能是 -e + s 或 -es
-            # -s 一般情况
-            (r's$', '', 1),
-        ]
+        # 规则词表为模块级常量，所有实例共享
+        self.irregular_plurals = _IRREGULAR_PLURALS
+        self.no_normalize = _NO_NORMALIZE
+        self.adjective_masculine = _ADJECTIVE_MASCULINE
     
     def normalize(self, word: str) -> NormalizedWord:
         """
@@ -108,25 +155,38 @@ class SpanishNormalizer:
         Returns:
             NormalizedWord 包含归一化结果
         """
-        original = word
+        word_lower = word.lower()
+        
+        cached = self._normalize_cache.get(word_lower)
+        if cached is None:
+            cached = self._normalize_lower(word_lower)
+            self._add_to_cache(word_lower, cached)
+        
+        normalized, changes, confidence = cached
+        return NormalizedWord(
+            word,
+            word if normalized is None else normalized,
+            list(changes),
+            confidence
+        )
+    
+    def _normalize_lower(self, word_lower: str) -> Tuple[Optional[str], Tuple[str, ...], float]:
+        """
+        归一化的核心逻辑（只依赖小写词和词典，结果可缓存）
+        
+        Returns:
+            (归一化结果，None 表示保留原词, 应用的变化规则, 置信度)
+        """
         changes = []
         confidence = 1.0
         
-        # 转小写处理
-        word_lower = word.lower()
-        
         # 检查是否在不归一化列表
         if word_lower in self.no_normalize:
-            return NormalizedWord(original, word, [], 1.0)
+            return None, (), 1.0
         
         # 检查不规则复数
         if word_lower in self.irregular_plurals:
-            return NormalizedWord(
-                original,
-                self.irregular_plurals[word_lower],
-                ['irregular_plural'],
-                0.95
-            )
+            return self.irregular_plurals[word_lower], ('irregular_plural',), 0.95
         
         # 1. 复数还原
         word_singular, plural_change = self._depluralize(word_lower)
@@ -142,7 +202,21 @@ class SpanishNormalizer:
             confidence *= 0.85
             word_lower = word_masc
         
-        return NormalizedWord(original, word_lower, changes, confidence)
+        return word_lower, tuple(changes), confidence
+    
+    def _add_to_cache(self, word_lower: str, result: Tuple[Optional[str], Tuple[str, ...], float]):
+        """添加到缓存"""
+        # 防止缓存过大
+        if len(self._normalize_cache) >= self._cache_max_size:
+            # 清空一半（保留较新的一半）
+            items = list(self._normalize_cache.items())
+            self._normalize_cache = dict(items[self._cache_max_size // 2:])
+        
+        self._normalize_cache[word_lower] = result
+    
+    def clear_cache(self):
+        """清空缓存"""
+        self._normalize_cache.clear()
     
     def _depluralize(self, word: str) -> Tuple[str, Optional[str]]:
         """
@@ -154,40 +228,21 @@ class SpanishNormalizer:
         if len(word) < 3:
             return word, None
         
-        # 尝试各种复数规则
-        
-        # -ces → -z
-        if word.endswith('ces') and len(word) > 3:
-            singular = word[:-3] + 'z'
-            if self._is_valid_word(singular):
-                return singular, 'ces→z'
-        
-        # -iones → -ión
-        if word.endswith('iones') and len(word) > 5:
-            singular = word[:-5] + 'ión'
-            if self._is_valid_word(singular):
-                return singular, 'iones→ión'
-        
-        # -es 辅音结尾
-        if word.endswith('es') and len(word) > 3:
-            if word[-3] in 'bcdfghjklmnpqrstvwxyz':
-                singular = word[:-2]
-                if self._is_valid_word(singular):
-                    return singular, 'es→∅'
-        
-        # -s 一般情况（元音+s）
-        if word.endswith('s') and len(word) > 2:
-            if word[-2] in 'aeiouáéíóú':
-                singular = word[:-1]
-                if self._is_valid_word(singular):
-                    return singular, 's→∅'
+        rules = _PLURAL_RULES.get(word[-1])
+        if rules is None:
+            return word, None
         
-        # 即使词典没有，也尝试基本的 -s 去除
-        if word.endswith('s') and len(word) > 2 and word[-2] in 'aeiouáéíóú':
-            return word[:-1], 's→∅(unverified)'
+        # 尝试各种复数规则（词典验证）
+        for rule in rules:
+            singular = _apply_rule(word, rule)
+            if singular is not None and self._is_valid_word(singular):
+                return singular, rule[-1]
         
-        if word.endswith('es') and len(word) > 3 and word[-3] in 'bcdfghjklmnpqrstvwxyz':
-            return word[:-2], 'es→∅(unverified)'
+        # 即使词典没有，也尝试基本的 -s / -es 去除
+        for rule in _UNVERIFIED_PLURAL_RULES:
+            singular = _apply_rule(word, rule)
+            if singular is not None:
+                return singular, rule[-1]
         
         return word, None
     
@@ -201,30 +256,11 @@ class SpanishNormalizer:
         if len(word) < 2:
             return word, None
         
-        # -a → -o
-        if word.endswith('a'):
-            masculine = word[:-1] + 'o'
-            # 检查阳性形式是否在词典或已知形容词中
-            if masculine in self.adjective_masculine or self._is_valid_word(masculine):
-                return masculine, 'a→o'
-        
-        # -as → -os (复数阴性 → 复数阳性)
-        if word.endswith('as') and len(word) > 2:
-            masculine = word[:-2] + 'os'
-            if self._is_valid_word(masculine):
-                return masculine, 'as→os'
-        
-        # -ora → -or
-        if word.endswith('ora') and len(word) > 3:
-            masculine = word[:-3] + 'or'
-            if self._is_valid_word(masculine):
-                return masculine, 'ora→or'
-        
-        # -esa/-isa → -és/-ís (国籍等)
-        if word.endswith('esa') and len(word) > 3:
-            masculine = word[:-3] + 'és'
-            if self._is_valid_word(masculine):
-                return masculine, 'esa→és'
+        # 检查阳性形式是否在词典或已知形容词中
+        for rule in _MASCULINE_RULES.get(word[-1], ()):
+            masculine = _apply_rule(word, rule)
+            if masculine is not None and self._is_valid_word(masculine):
+                return masculine, rule[-1]
         
         return word, None
     
@@ -238,12 +274,14 @@ class SpanishNormalizer:
         return False
     
     def set_dictionary(self, dictionary: Set[str]):
-        """设置词典"""
-        self.dictionary = dictionary
+        """设置词典（复制为 frozenset，调用方之后修改传入的集合不会让缓存结果过期）"""
+        self.dictionary = frozenset(dictionary)
+        self.clear_cache()
     
     def add_to_dictionary(self, words: List[str]):
         """添加词到词典"""
-        self.dictionary.update(w.lower() for w in words)
+        self.dictionary = self.dictionary.union(w.lower() for w in words)
+        self.clear_cache()
     
     def normalize_batch(self, words: List[str]) -> Dict[str, str]:
         """
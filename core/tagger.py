@@ -3,7 +3,8 @@
 识别8种标签类型：品牌词、商品词、人群词、场景词、颜色词、尺寸词、卖点词、属性词
 """
 import re
-from typing import List, Dict, Optional, Tuple
+from operator import itemgetter
+from typing import List, Dict, Optional, Set, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
@@ -20,9 +21,34 @@ class TagType(Enum):
     ATTRIBUTE = "属性词"
 
 
+# 词典名 → 标签（顺序即词典匹配结果的顺序）
+_TAG_DICT_MAPPING = (
+    ("brands", TagType.BRAND.value),
+    ("products", TagType.PRODUCT.value),
+    ("audiences", TagType.AUDIENCE.value),
+    ("scenarios", TagType.SCENARIO.value),
+    ("colors", TagType.COLOR.value),
+    ("features", TagType.FEATURE.value),
+    ("attributes", TagType.ATTRIBUTE.value),
+)
+
+# 品牌词匹配时同时查这些子词典
+_BRAND_DICT_NAMES = ("brands", "brands_zh", "brands_ja")
+
+# 候选按置信度排序的 key
+_CONFIDENCE_KEY = itemgetter("confidence")
+
+# 启发式推断用的词表
+_COMMON_WORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'for', 'with', 'new', 'pro', 'max', 'mini'})
+_ADJ_PATTERNS = frozenset({'slim', 'wide', 'high', 'low', 'long', 'short', 'mini', 'maxi'})
+_JA_PRODUCT_ENDINGS = ('ケース', 'カバー', 'ホルダー', 'スタンド', 'ラック', 'ボックス', 'バッグ')
+
+
 @dataclass
 class TagResult:
     """标注结果"""
+    __slots__ = ('token', 'tags', 'confidence', 'method')
+    
     token: str
     tags: List[str]
     confidence: float
@@ -34,6 +60,14 @@ class Tagger:
     
     def __init__(self, dictionary_manager):
         self.dict_manager = dictionary_manager
+        # token → 与位置无关的标注结论 (标签, 置信度, 方法)，无候选时为 ()；
+        # 词典版本变化时整体失效
+        self._token_cache: Dict[str, Tuple] = {}
+        self._cache_max_size = 65536
+        self._cache_version = None
+        # 小写词 → 各词典命中的 (标签, 置信度)，按需构建，词典版本变化时重建
+        self._dict_index: Optional[Dict[str, Tuple[Tuple[str, float], ...]]] = None
+        self._dict_index_version = None
         self._build_patterns()
         self._build_inference_rules()
     
@@ -57,9 +91,9 @@ class Tagger:
             r'^\d+l$',  # 15l 等容量
         ]
         
-        # 编译正则
-        self.compiled_color_patterns = [re.compile(p, re.IGNORECASE) for p in self.color_patterns]
-        self.compiled_size_patterns = [re.compile(p, re.IGNORECASE) for p in self.size_patterns]
+        # 编译正则：同类模式合并为一个分支正则，一次 match 即可
+        self.color_regex = re.compile('|'.join(f'(?:{p})' for p in self.color_patterns), re.IGNORECASE)
+        self.size_regex = re.compile('|'.join(f'(?:{p})' for p in self.size_patterns), re.IGNORECASE)
     
     def _build_inference_rules(self):
         """构建推断规则 - 多语言支持"""
@@ -163,6 +197,21 @@ class Tagger:
             'high', 'low', 'waist', 'long', 'short', 'slim', 'wide',
             'open ear', 'wireless', 'bluetooth',
         }
+        
+        # 关键字（小写）→ 命中的 (标签, 置信度)，按下面规则顺序排列；
+        # 一次字典查询代替逐个集合判断
+        rule_table = [
+            (self.product_suffixes, TagType.PRODUCT.value, 0.85),
+            (self.audience_keywords, TagType.AUDIENCE.value, 0.85),
+            (self.scenario_keywords, TagType.SCENARIO.value, 0.85),
+            (self.feature_keywords, TagType.FEATURE.value, 0.85),
+            (self.attribute_keywords, TagType.ATTRIBUTE.value, 0.8),
+        ]
+        self.keyword_tags: Dict[str, Tuple[Tuple[str, float], ...]] = {}
+        for keywords, tag, confidence in rule_table:
+            for keyword in keywords:
+                keyword = keyword.lower()
+                self.keyword_tags[keyword] = self.keyword_tags.get(keyword, ()) + ((tag, confidence),)
     
     def tag(self, tokens: List[str], context: Optional[str] = None) -> List[TagResult]:
         """
@@ -176,11 +225,11 @@ class Tagger:
             标注结果列表
         """
         results = []
+        self._check_cache_version()
         
         for i, token in enumerate(tokens):
             # 传入位置信息用于推断
-            tag_result = self._tag_single(token, tokens, context, position=i)
-            results.append(tag_result)
+            results.append(self._label(token, tokens, context, position=i))
         
         return results
     
@@ -192,11 +241,75 @@ class Tagger:
         position: int = 0
     ) -> TagResult:
         """标注单个 token"""
+        self._check_cache_version()
+        return self._label(token, all_tokens, context, position)
+    
+    def _check_cache_version(self):
+        """词典内容变化后清空缓存"""
+        version = getattr(self.dict_manager, "version", None)
+        if version != self._cache_version:
+            self._token_cache.clear()
+            self._cache_version = version
+    
+    def _label(
+        self,
+        token: str,
+        all_tokens: List[str],
+        context: Optional[str],
+        position: int
+    ) -> TagResult:
+        """
+        标注单个 token
         
+        词典/正则/规则有候选时，结论与位置无关，直接用缓存（快速路径）；
+        否则才做位置相关的启发式推断
+        """
+        decision = self._get_decision(token)
+        
+        # 4. 启发式推断（基于词形特征）
+        if not decision:
+            candidates = self._infer_heuristic(token, all_tokens, context, position)
+            if not candidates:
+                return TagResult(
+                    token=token,
+                    tags=["属性词"],  # 默认标签
+                    confidence=0.5,
+                    method="default"
+                )
+            decision = self._select(candidates)
+        
+        tags, confidence, method = decision
+        return TagResult(
+            token=token,
+            tags=list(tags),
+            confidence=confidence,
+            method=method
+        )
+    
+    def _get_decision(self, token: str) -> Tuple:
+        """获取 token 与位置无关的标注结论（带缓存）"""
+        decision = self._token_cache.get(token)
+        if decision is None:
+            candidates = self._match_token(token)
+            decision = self._select(candidates) if candidates else ()
+            # 防止缓存过大：清空一半（保留较新的一半）
+            if len(self._token_cache) >= self._cache_max_size:
+                items = list(self._token_cache.items())
+                self._token_cache = dict(items[self._cache_max_size // 2:])
+            self._token_cache[token] = decision
+        return decision
+    
+    def clear_cache(self):
+        """清空缓存"""
+        self._token_cache.clear()
+    
+    def _match_token(self, token: str) -> List[Dict]:
+        """与位置无关的候选：词典匹配 → 正则模式 → 规则推断"""
         candidates = []
+        token_lower = token.lower()
         
         # 1. 词典匹配（最高优先级）
-        dict_result = self._match_dictionary(token)
+        dict_result = self._match_dictionary(token, token_lower)
         if dict_result:
             candidates.extend(dict_result)
         
@@ -207,144 +320,120 @@ class Tagger:
         
         # 3. 规则推断（基于关键字匹配）
         if not candidates or all(c["confidence"] < 0.8 for c in candidates):
-            infer_result = self._infer_by_rules(token, all_tokens, position)
+            infer_result = self._infer_by_rules(token, token_lower)
             if infer_result:
                 candidates.extend(infer_result)
         
-        # 4. 启发式推断（基于词形特征）
-        if not candidates:
-            heuristic_result = self._infer_heuristic(token, all_tokens, context, position)
-            if heuristic_result:
-                candidates.extend(heuristic_result)
-        
-        # 合并结果
-        if not candidates:
-            return TagResult(
-                token=token,
-                tags=["属性词"],  # 默认标签
-                confidence=0.5,
-                method="default"
-            )
-        
-        # 按置信度排序，取最高的
-        candidates.sort(key=lambda x: x["confidence"], reverse=True)
-        
-        # 取置信度最高的标签
-        top_tags = []
-        top_confidence = candidates[0]["confidence"]
-        
-        for c in candidates:
-            if c["confidence"] >= top_confidence - 0.1:
-                if c["tag"] not in top_tags:
-                    top_tags.append(c["tag"])
-        
-        return TagResult(
-            token=token,
-            tags=top_tags[:2],
-            confidence=top_confidence,
-            method=candidates[0]["method"]
-        )
+        return candidates
     
-    def _match_dictionary(self, token: str) -> List[Dict]:
-        """从词典匹配"""
-        results = []
-        token_lower = token.lower()
+    def _select(self, candidates: List[Dict]) -> Tuple[Tuple[str, ...], float, str]:
+        """从候选中选出最终结论：(标签, 置信度, 方法)"""
+        # 取置信度最高的，以及与之相差 0.1 以内的候选
+        top_confidence = max(c["confidence"] for c in candidates)
+        threshold = top_confidence - 0.1
+        top = [c for c in candidates if c["confidence"] >= threshold]
+        if len(top) > 1:
+            # 稳定排序：同置信度保持原顺序
+            top.sort(key=_CONFIDENCE_KEY, reverse=True)
         
-        tag_dict_mapping = {
-            "brands": TagType.BRAND.value,
-            "products": TagType.PRODUCT.value,
-            "audiences": TagType.AUDIENCE.value,
-            "scenarios": TagType.SCENARIO.value,
-            "colors": TagType.COLOR.value,
-            "features": TagType.FEATURE.value,
-            "attributes": TagType.ATTRIBUTE.value,
-        }
+        top_tags = []
+        for c in top:
+            if c["tag"] not in top_tags:
+                top_tags.append(c["tag"])
         
-        for dict_name, tag_type in tag_dict_mapping.items():
-            if self.dict_manager.contains(dict_name, token_lower):
-                entry = self.dict_manager.get_entry(dict_name, token_lower)
-                confidence = entry.get("confidence", 0.9) if entry else 0.9
-                results.append({
-                    "tag": tag_type,
-                    "confidence": confidence,
-                    "method": "dict"
-                })
+        return tuple(top_tags[:2]), top_confidence, top[0]["method"]
+    
+    def _match_dictionary(self, token: str, token_lower: Optional[str] = None) -> List[Dict]:
+        """从词典匹配（token_lower 为调用方已算好的 token.lower()）"""
+        if token_lower is None:
+            token_lower = token.lower()
+        hits = self._get_dict_index().get(token_lower)
+        if not hits:
+            return []
+        
+        return [
+            {
+                "tag": tag_type,
+                "confidence": confidence,
+                "method": "dict"
+            }
+            for tag_type, confidence in hits
+        ]
+    
+    def _get_dict_index(self) -> Dict[str, Tuple[Tuple[str, float], ...]]:
+        """获取词典索引，词典内容变化后重建"""
+        version = getattr(self.dict_manager, "version", None)
+        if self._dict_index is None or version != self._dict_index_version:
+            self._dict_index = self._build_dict_index()
+            self._dict_index_version = version
+        return self._dict_index
+    
+    def _build_dict_index(self) -> Dict[str, Tuple[Tuple[str, float], ...]]:
+        """把各词典合并为一张表：小写词 → ((标签, 置信度), ...)"""
+        index: Dict[str, Tuple[Tuple[str, float], ...]] = {}
+        
+        for dict_name, tag_type in _TAG_DICT_MAPPING:
+            # 置信度取该词典中第一个同名词条
+            confidences: Dict[str, float] = {}
+            for entry in self.dict_manager.get_entries(dict_name):
+                word = entry.get("word", "").lower()
+                if word and word not in confidences:
+                    confidences[word] = entry.get("confidence", 0.9)
+            
+            # 品牌词包含所有品牌子词典；子词典中的词在主词典没有词条时置信度为 0.9
+            names = _BRAND_DICT_NAMES if dict_name == "brands" else (dict_name,)
+            words: Set[str] = set()
+            for name in names:
+                for entry in self.dict_manager.get_entries(name):
+                    word = entry.get("word", "").lower()
+                    if word:
+                        words.add(word)
+            
+            for word in words:
+                index[word] = index.get(word, ()) + ((tag_type, confidences.get(word, 0.9)),)
         
-        return results
+        return index
     
     def _match_patterns(self, token: str) -> List[Dict]:
         """正则模式匹配"""
         results = []
         
-        # 颜色词模式
-        for pattern in self.compiled_color_patterns:
-            if pattern.match(token):
-                results.append({
-                    "tag": TagType.COLOR.value,
-                    "confidence": 0.85,
-                    "method": "pattern"
-                })
-                break
-        
-        # 尺寸词模式
-        for pattern in self.compiled_size_patterns:
-            if pattern.match(token):
-                results.append({
-                    "tag": TagType.SIZE.value,
-                    "confidence": 0.95,
-                    "method": "pattern"
-                })
-                break
-        
-        return results
-    
-    def _infer_by_rules(self, token: str, all_tokens: List[str], position: int) -> List[Dict]:
-        """基于规则推断"""
-        results = []
-        token_lower = token.lower()
-        
-        # 检查是否是商品词
-        if token_lower in self.product_suffixes or token in self.product_suffixes:
-            results.append({
-                "tag": TagType.PRODUCT.value,
-                "confidence": 0.85,
-                "method": "rule_inference"
-            })
-        
-        # 检查是否是人群词
-        if token_lower in self.audience_keywords or token in self.audience_keywords:
-            results.append({
-                "tag": TagType.AUDIENCE.value,
-                "confidence": 0.85,
-                "method": "rule_inference"
-            })
-        
-        # 检查是否是场景词
-        if token_lower in self.scenario_keywords or token in self.scenario_keywords:
+        # 颜色词模式：都以"色"/"系"结尾，不含这两个字的 token 不必跑正则
+        if ('色' in token or '系' in token) and self.color_regex.match(token):
             results.append({
-                "tag": TagType.SCENARIO.value,
+                "tag": TagType.COLOR.value,
                 "confidence": 0.85,
-                "method": "rule_inference"
+                "method": "pattern"
             })
         
-        # 检查是否是卖点词
-        if token_lower in self.feature_keywords or token in self.feature_keywords:
+        # 尺寸词模式：需要数字，或是最长 4 个字母的尺码（S/M/L/XL/...）；
+        # 超过 4 个字符的纯字母 token 不可能匹配
+        if not (len(token) > 4 and token.isalpha()) and self.size_regex.match(token):
             results.append({
-                "tag": TagType.FEATURE.value,
-                "confidence": 0.85,
-                "method": "rule_inference"
-            })
-        
-        # 检查是否是属性词
-        if token_lower in self.attribute_keywords or token in self.attribute_keywords:
-            results.append({
-                "tag": TagType.ATTRIBUTE.value,
-                "confidence": 0.8,
-                "method": "rule_inference"
+                "tag": TagType.SIZE.value,
+                "confidence": 0.95,
+                "method": "pattern"
             })
         
         return results
     
+    def _infer_by_rules(self, token: str, token_lower: Optional[str] = None) -> List[Dict]:
+        """基于规则推断（token_lower 为调用方已算好的 token.lower()）"""
+        if token_lower is None:
+            token_lower = token.lower()
+        hits = self.keyword_tags.get(token_lower)
+        if not hits:
+            return []
+        
+        return [
+            {
+                "tag": tag,
+                "confidence": confidence,
+                "method": "rule_inference"
+            }
+            for tag, confidence in hits
+        ]
+    
     def _infer_heuristic(
         self, 
         token: str, 
@@ -357,9 +446,8 @@ class Tagger:
         token_lower = token.lower()
         
         # 规则1: 首字母大写的英文词可能是品牌（但排除常见词）
-        common_words = {'the', 'a', 'an', 'and', 'or', 'for', 'with', 'new', 'pro', 'max', 'mini'}
         if (token[0].isupper() and token.isalpha() and len(token) > 2 
-            and token_lower not in common_words
+            and token_lower not in _COMMON_WORDS
             and position == 0):  # 通常品牌在开头
             results.append({
                 "tag": TagType.BRAND.value,
@@ -378,8 +466,7 @@ class Tagger:
         # 规则3: 位置在末尾且是形容词形式可能是属性词
         if position == len(all_tokens) - 1:
             # 检查是否像形容词（如 slim, wide, high 等）
-            adj_patterns = ['slim', 'wide', 'high', 'low', 'long', 'short', 'mini', 'maxi']
-            if token_lower in adj_patterns:
+            if token_lower in _ADJ_PATTERNS:
                 results.append({
                     "tag": TagType.ATTRIBUTE.value,
                     "confidence": 0.75,
@@ -388,15 +475,12 @@ class Tagger:
         
         # 规则4: 检查词尾特征
         # 日语商品词后缀
-        ja_product_endings = ['ケース', 'カバー', 'ホルダー', 'スタンド', 'ラック', 'ボックス', 'バッグ']
-        for ending in ja_product_endings:
-            if token.endswith(ending):
-                results.append({
-                    "tag": TagType.PRODUCT.value,
-                    "confidence": 0.8,
-                    "method": "heuristic"
-                })
-                break
+        if token.endswith(_JA_PRODUCT_ENDINGS):
+            results.append({
+                "tag": TagType.PRODUCT.value,
+                "confidence": 0.8,
+                "method": "heuristic"
+            })
         
         return results
 
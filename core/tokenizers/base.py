@@ -1,14 +1,20 @@
 """
 分词器基类
 """
+import sys
 from abc import ABC, abstractmethod
 from typing import List, Optional
 from dataclasses import dataclass
 
 
-@dataclass
+# 字段带默认值的 dataclass 不能手写 __slots__，Python 3.10+ 由 dataclass(slots=True) 生成；
+# 3.9 上退回普通 dataclass（行为相同，只是实例带 __dict__）
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class Token:
-    """分词结果"""
+    """分词结果（分词器每个词都会生成一个 Token，用 __slots__ 省去每个实例的 __dict__）"""
     text: str
     start: int = 0
     end: int = 0
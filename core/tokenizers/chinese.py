@@ -1,7 +1,8 @@
 """
 中文分词器
 """
-from typing import List
+import threading
+from typing import List, Optional
 from core.tokenizers.base import BaseTokenizer, Token
 
 _jieba = None
@@ -16,6 +17,69 @@ def get_jieba():
     return _jieba
 
 
+# jieba 是进程级全局状态：后台加载线程每个进程只启动一次，
+# 已添加的自定义词记录在这里，同一个词只添加一次。
+# 注意 fork：后台线程加载期间持有 _custom_words_lock 和 jieba 自身的初始化锁，
+# 加载中 fork 出的子进程会继承处于持有状态的锁而永远等待。
+# 创建过 ChineseTokenizer 的进程需要多进程时，请用 spawn 方式启动子进程
+# （如 multiprocessing.get_context("spawn")），不要 fork。
+_custom_words_lock = threading.Lock()
+_custom_words_added = set()
+_custom_words_loader = None
+
+
+def _add_custom_words(jieba, words):
+    """把尚未添加过的多字词加入 jieba"""
+    with _custom_words_lock:
+        for word in words:
+            if len(word) > 1 and word not in _custom_words_added:  # 只添加多字词
+                jieba.add_word(word)
+                _custom_words_added.add(word)
+
+
+class _CustomWordsLoader(threading.Thread):
+    """后台初始化 jieba 主词典并添加自定义词，出错时保存异常，由等待方抛出"""
+    
+    def __init__(self, jieba, words: List[str]):
+        super().__init__(name="jieba-custom-words", daemon=True)
+        self.jieba = jieba
+        self.words = words
+        self.error: Optional[BaseException] = None
+    
+    def run(self):
+        try:
+            self.jieba.initialize()
+            _add_custom_words(self.jieba, self.words)
+        except BaseException as e:
+            self.error = e
+    
+    def wait(self):
+        """
+        等待加载结束
+        
+        加载失败时清除进程内的加载器（下次分词/加词时重新加载），
+        每次抛出新的 RuntimeError，原异常作为 __cause__
+        """
+        global _custom_words_loader
+        self.join()
+        if self.error is not None:
+            with _custom_words_lock:
+                if _custom_words_loader is self:
+                    _custom_words_loader = None
+            raise RuntimeError("jieba custom-word loading failed") from self.error
+
+
+def _start_custom_words_loader(jieba, words: List[str]) -> Optional[_CustomWordsLoader]:
+    """启动进程内唯一的后台加载线程；已经启动过时返回 None"""
+    global _custom_words_loader
+    with _custom_words_lock:
+        if _custom_words_loader is not None:
+            return None
+        _custom_words_loader = _CustomWordsLoader(jieba, words)
+    _custom_words_loader.start()
+    return _custom_words_loader
+
+
 class ChineseTokenizer(BaseTokenizer):
     """中文分词器"""
     
@@ -23,21 +87,37 @@ class ChineseTokenizer(BaseTokenizer):
         super().__init__(dictionary_manager)
         self.jieba = get_jieba()
         
-        # 将词典中的词添加到jieba
+        # 将词典中的词添加到jieba：词表在当前线程取好（后台线程不读 dictionary_manager），
+        # jieba 主词典初始化和加词在后台线程中完成，构造函数立即返回，
+        # 首次分词/加词前再等待加载结束
+        self._words: Optional[List[str]] = None
+        self._pending_words: Optional[List[str]] = None
         if dictionary_manager:
-            self._load_custom_words(dictionary_manager)
+            self._words = dictionary_manager.get_all_words_for_tokenizer("zh")
+            self._start_loader()
     
-    def _load_custom_words(self, dict_manager):
-        """从词典加载自定义词"""
-        words = dict_manager.get_all_words_for_tokenizer("zh")
-        for word in words:
-            if len(word) > 1:  # 只添加多字词
-                self.jieba.add_word(word)
+    def _start_loader(self):
+        """启动后台加载；其他实例已启动加载时，等它结束后再补充本实例词典中的新词"""
+        if _start_custom_words_loader(self.jieba, self._words) is None:
+            self._pending_words = self._words
+    
+    def _wait_custom_words(self):
+        """等待后台的自定义词加载完成，加载失败时抛出异常"""
+        if _custom_words_loader is None and self._words is not None:
+            # 上次加载失败，加载器已清除，重新启动加载
+            self._start_loader()
+        loader = _custom_words_loader
+        if loader is not None:
+            loader.wait()
+        if self._pending_words is not None:
+            _add_custom_words(self.jieba, self._pending_words)
+            self._pending_words = None
     
     def tokenize(self, text: str) -> List[Token]:
         """中文分词"""
         if not text:
             return []
+        self._wait_custom_words()
         words = self.jieba.lcut(text)
         tokens = []
         for word in words:
@@ -48,6 +128,7 @@ class ChineseTokenizer(BaseTokenizer):
     
     def add_word(self, word: str, freq: int = None):
         """添加词"""
+        self._wait_custom_words()
         if freq:
             self.jieba.add_word(word, freq)
         else:
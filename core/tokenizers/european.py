@@ -7,6 +7,13 @@ from core.tokenizers.base import BaseTokenizer, Token
 from core.language_detector import Language
 
 
+# 基本分词的分隔符：空白和常见标点
+_SPLIT_PATTERN = re.compile(r'[\s,;:!?()[\]{}]+')
+
+# 纯 ASCII 文本的快速分词：标点换成空格后直接 str.split()（空白判定与 \s 一致）
+_DELIMITER_TABLE = str.maketrans(dict.fromkeys(',;:!?()[]{}', ' '))
+
+
 class EuropeanTokenizer(BaseTokenizer):
     """欧语分词器"""
     
@@ -21,15 +28,20 @@ class EuropeanTokenizer(BaseTokenizer):
             return []
         
         # 基本分词：按空格和标点分割
-        words = re.split(r'[\s,;:!?()[\]{}]+', text)
-        words = [w for w in words if w]
+        if text.isascii():
+            # translate 对纯 ASCII 文本有快速路径；含非 ASCII 字符时反而比正则慢
+            words = text.translate(_DELIMITER_TABLE).split()
+        else:
+            words = _SPLIT_PATTERN.split(text)
+            words = [w for w in words if w]
         
-        # 法语特殊处理（撇号）
-        if self.language == Language.FRENCH:
+        # 法语特殊处理（撇号）；整段文本没有撇号/连字符时跳过逐词处理
+        if self.language == Language.FRENCH and "'" in text:
             words = self._process_french(words)
         
         # 处理连字符
-        words = self._handle_hyphens(words)
+        if '-' in text:
+            words = self._handle_hyphens(words)
         
         return [Token(text=w) for w in words if w]
     
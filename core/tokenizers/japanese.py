@@ -2,11 +2,14 @@
 日语分词器
 """
 import re
-from typing import List
+from typing import Dict, List, Tuple
 from core.tokenizers.base import BaseTokenizer, Token
 
 _sudachi_tokenizer = None
 
+# 超过此长度的文本不缓存分词结果（限制缓存内存）
+_CACHE_MAX_TEXT_LEN = 256
+
 
 def get_sudachi():
     global _sudachi_tokenizer
@@ -26,6 +29,9 @@ class JapaneseTokenizer(BaseTokenizer):
     def __init__(self, dictionary_manager=None):
         super().__init__(dictionary_manager)
         self.tokenizer = get_sudachi()
+        # 文本 → 分词结果（词面），重复出现的标题不再调用 sudachi
+        self._tokenize_cache: Dict[str, Tuple[str, ...]] = {}
+        self._cache_max_size = 4096
     
     def tokenize(self, text: str) -> List[Token]:
         """日语分词"""
@@ -35,17 +41,41 @@ class JapaneseTokenizer(BaseTokenizer):
         if self.tokenizer == "fallback":
             return self._simple_tokenize(text)
         
-        try:
-            from sudachipy import tokenizer as sudachi_tokenizer
-            morphemes = self.tokenizer.tokenize(text, sudachi_tokenizer.Tokenizer.SplitMode.C)
-            tokens = []
-            for m in morphemes:
-                surface = m.surface().strip()
-                if surface:
-                    tokens.append(Token(text=surface))
-            return tokens
-        except Exception:
-            return self._simple_tokenize(text)
+        surfaces = self._tokenize_cache.get(text)
+        if surfaces is None:
+            try:
+                surfaces = self._sudachi_surfaces(text)
+            except Exception:
+                return self._simple_tokenize(text)
+            if len(text) <= _CACHE_MAX_TEXT_LEN:
+                self._add_to_cache(text, surfaces)
+        
+        return [Token(text=surface) for surface in surfaces]
+    
+    def _sudachi_surfaces(self, text: str) -> Tuple[str, ...]:
+        """用 sudachi 分词，返回去掉空白后的非空词面"""
+        from sudachipy import tokenizer as sudachi_tokenizer
+        morphemes = self.tokenizer.tokenize(text, sudachi_tokenizer.Tokenizer.SplitMode.C)
+        surfaces = []
+        for m in morphemes:
+            surface = m.surface().strip()
+            if surface:
+                surfaces.append(surface)
+        return tuple(surfaces)
+    
+    def _add_to_cache(self, text: str, surfaces: Tuple[str, ...]):
+        """添加到缓存"""
+        # 防止缓存过大
+        if len(self._tokenize_cache) >= self._cache_max_size:
+            # 清空一半（保留较新的一半）
+            items = list(self._tokenize_cache.items())
+            self._tokenize_cache = dict(items[self._cache_max_size // 2:])
+        
+        self._tokenize_cache[text] = surfaces
+    
+    def clear_cache(self):
+        """清空缓存"""
+        self._tokenize_cache.clear()
     
     def _simple_tokenize(self, text: str) -> List[Token]:
         """简单分词（fallback）"""
@@ -4,9 +4,15 @@
 
 读取扩充文件，将词条添加到对应的词典文件中
 """
-import json
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Dict, List, Optional
+
+# 添加项目根目录到 path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.json_io import read_json, write_json
 
 # 标签到词典文件的映射
 TAG_TO_DICT = {
@@ -20,20 +26,8 @@ TAG_TO_DICT = {
     "属性词": "attributes.json",
 }
 
-
-def load_json(path: Path) -> dict:
-    """加载 JSON 文件"""
-    if path.exists():
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {"entries": []}
-
-
-def save_json(path: Path, data: dict):
-    """保存 JSON 文件"""
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+# 扩充文件数达到此值才用进程池并行解析（文件少时进程启动开销大于解析本身）
+PARALLEL_MIN_FILES = 8
 
 
 def get_existing_words(data: dict) -> set:
@@ -41,63 +35,118 @@ def get_existing_words(data: dict) -> set:
     return {entry.get("word", "").lower() for entry in data.get("entries", [])}
 
 
-def apply_expansion(expansion_file: Path, dict_base: Path, dry_run: bool = False):
-    """应用扩充文件"""
-    print(f"\n处理: {expansion_file.name}")
+def load_target(loaded: Dict[Path, dict], dict_path: Path) -> dict:
+    """
+    获取目标词典的加载状态，每个词典文件只读取一次
+    
+    状态: {"data": 词典内容, "words": 已有词（小写）, "added": 本次新增条数}
+    """
+    state = loaded.get(dict_path)
+    if state is None:
+        data = read_json(dict_path) if dict_path.exists() else {"entries": []}
+        state = loaded[dict_path] = {
+            "data": data,
+            "words": get_existing_words(data),
+            "added": 0,
+        }
+    return state
+
+
+def save_targets(loaded: Dict[Path, dict], dict_base: Path):
+    """把有新增词条的词典写回文件（每个文件只写一次）"""
+    for dict_path, state in loaded.items():
+        if state["added"] > 0:
+            dict_path.parent.mkdir(parents=True, exist_ok=True)
+            write_json(dict_path, state["data"])
+            print(f"  ✓ {dict_path.relative_to(dict_base).as_posix()}: 写入 {state['added']} 条新词")
+
+
+def parse_expansion(expansion_file: Path) -> dict:
+    """
+    读取扩充文件，过滤虚词并按目标词典分组
     
-    with open(expansion_file, 'r', encoding='utf-8') as f:
-        expansion = json.load(f)
+    只读扩充文件本身、不碰词典文件，可以在多个进程中并行执行
+    
+    Returns:
+        {"name": 文件名, "language": 语言, "by_dict": {词典文件: [词条, ...]}, "stopword": 虚词数}
+    """
+    expansion = read_json(expansion_file)
     
     language = expansion.get("language", "unknown")
     entries = expansion.get("entries", [])
     stopwords = set(expansion.get("stopwords", []))
-    
-    # 统计
-    stats = {"added": 0, "skipped": 0, "stopword": 0}
+    stopword_count = 0
     
     # 按目标词典分组
     by_dict = {}
+    dict_for_tag = TAG_TO_DICT.get
     for entry in entries:
-        word = entry.get("word", "")
-        tag = entry.get("tag", "属性词")
+        get = entry.get
         
         # 跳过虚词
-        if word.lower() in stopwords:
-            stats["stopword"] += 1
+        if get("word", "").lower() in stopwords:
+            stopword_count += 1
             continue
         
-        dict_file = TAG_TO_DICT.get(tag, "attributes.json")
-        if dict_file not in by_dict:
-            by_dict[dict_file] = []
-        by_dict[dict_file].append(entry)
+        dict_file = dict_for_tag(get("tag", "属性词"), "attributes.json")
+        group = by_dict.get(dict_file)
+        if group is None:
+            group = by_dict[dict_file] = []
+        group.append(entry)
+    
+    return {
+        "name": expansion_file.name,
+        "language": language,
+        "by_dict": by_dict,
+        "stopword": stopword_count,
+    }
+
+
+def merge_expansion(
+    parsed: dict,
+    dict_base: Path,
+    dry_run: bool,
+    loaded: Dict[Path, dict]
+) -> dict:
+    """把 parse_expansion 的结果合并到已加载的词典中（只改内存，不写文件）"""
+    print(f"\n处理: {parsed['name']}")
+    
+    # 统计
+    stats = {"added": 0, "skipped": 0, "stopword": parsed["stopword"]}
     
     # 应用到各词典
-    for dict_file, new_entries in by_dict.items():
-        dict_path = dict_base / dict_file
-        existing = load_json(dict_path)
-        existing_words = get_existing_words(existing)
+    for dict_file, new_entries in parsed["by_dict"].items():
+        target = load_target(loaded, dict_base / dict_file)
+        existing = target["data"]
+        existing_words = target["words"]
+        
+        append_entry = existing["entries"].append
+        add_word = existing_words.add
         
         added_count = 0
         for entry in new_entries:
             word = entry.get("word", "")
-            if word.lower() not in existing_words:
-                new_entry = {
-                    "word": word,
-                    "confidence": entry.get("confidence", 0.9),
-                }
-                if "note" in entry:
-                    new_entry["note"] = entry["note"]
-                
-                existing["entries"].append(new_entry)
-                existing_words.add(word.lower())
-                added_count += 1
-                stats["added"] += 1
-            else:
-                stats["skipped"] += 1
+            word_lower = word.lower()
+            if word_lower in existing_words:
+                continue
+            
+            new_entry = {
+                "word": word,
+                "confidence": entry.get("confidence", 0.9),
+            }
+            if "note" in entry:
+                new_entry["note"] = entry["note"]
+            
+            append_entry(new_entry)
+            add_word(word_lower)
+            added_count += 1
+        
+        stats["added"] += added_count
+        stats["skipped"] += len(new_entries) - added_count
         
+        target["added"] += added_count
         if added_count > 0 and not dry_run:
-            save_json(dict_path, existing)
-            print(f"  ✓ {dict_file}: 添加 {added_count} 条")
+            print(f"  + {dict_file}: 添加 {added_count} 条")
         elif added_count > 0:
             print(f"  [预览] {dict_file}: 将添加 {added_count} 条")
     
@@ -105,6 +154,41 @@ def apply_expansion(expansion_file: Path, dict_base: Path, dry_run: bool = False
     return stats
 
 
+def apply_expansion(
+    expansion_file: Path,
+    dict_base: Path,
+    dry_run: bool = False,
+    loaded: Optional[Dict[Path, dict]] = None
+):
+    """
+    应用扩充文件
+    
+    Args:
+        loaded: 多个扩充文件共享的词典加载状态（见 load_target），
+            传入时只在内存中累积新增词条，由调用方最后统一 save_targets；
+            不传时单独加载并立即写回
+    """
+    standalone = loaded is None
+    if standalone:
+        loaded = {}
+    
+    stats = merge_expansion(parse_expansion(expansion_file), dict_base, dry_run, loaded)
+    
+    if standalone and not dry_run:
+        save_targets(loaded, dict_base)
+    
+    return stats
+
+
+def parse_all(expansion_files: List[Path]) -> List[dict]:
+    """解析所有扩充文件；文件较多时用进程池并行解析（结果顺序与输入一致）"""
+    if len(expansion_files) < PARALLEL_MIN_FILES:
+        return [parse_expansion(f) for f in expansion_files]
+    
+    with ProcessPoolExecutor() as executor:
+        return list(executor.map(parse_expansion, expansion_files))
+
+
 def main():
     # 确定路径
     script_dir = Path(__file__).parent
@@ -129,12 +213,19 @@ def main():
     
     # 处理所有扩充文件
     total_stats = {"added": 0, "skipped": 0, "stopword": 0}
+    # 各目标词典只加载一次，所有扩充文件处理完后再统一写回
+    loaded: Dict[Path, dict] = {}
     
-    for exp_file in sorted(expansion_dir.glob("*.json")):
-        stats = apply_expansion(exp_file, dict_base, dry_run)
+    # 解析可以并行，合并到词典必须串行（同一词典只有一个写入方）
+    for parsed in parse_all(sorted(expansion_dir.glob("*.json"))):
+        stats = merge_expansion(parsed, dict_base, dry_run, loaded)
         for k, v in stats.items():
             total_stats[k] += v
     
+    if not dry_run:
+        print("\n写入词典:")
+        save_targets(loaded, dict_base)
+    
     print(f"\n{'='*50}")
     print(f"总计: 添加 {total_stats['added']} 条, 跳过 {total_stats['skipped']} 条")
     
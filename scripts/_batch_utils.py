@@ -0,0 +1,65 @@
+"""
+批量测试脚本（batch_test.py / batch_test_v2.py）共用的工具函数
+
+直接运行 scripts/ 下的脚本时 scripts/ 目录在 sys.path 中，可以 `from _batch_utils import ...`；
+需要先把项目根目录加入 sys.path（依赖 services.json_io）。
+"""
+import time
+
+from services.json_io import write_json
+
+# 进度输出的最小间隔（秒）
+PROGRESS_INTERVAL = 1.0
+
+
+def progress_reporter(label: str, total: int, interval: float = PROGRESS_INTERVAL):
+    """
+    返回进度回调 report(done)：最多每 interval 秒打印一次，最后一条必打印
+    （按固定条数打印时，大批量运行会产生大量终端/日志输出）
+    """
+    last = time.monotonic()
+    
+    def report(done):
+        nonlocal last
+        now = time.monotonic()
+        if done == total or now - last >= interval:
+            last = now
+            print(f"   {label}: {done}/{total} ({done/total*100:.1f}%)", flush=True)
+    
+    return report
+
+
+def save_json(path, data):
+    """保存测试结果 JSON（统计信息里有非字符串键，如置信度）"""
+    write_json(path, data, non_str_keys=True)
+
+
+def detect_encoding(file_path: str) -> str:
+    """检测文件编码（文件只读一次，按候选编码依次尝试解码同一份字节）"""
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    
+    encodings = ['utf-8', 'utf-8-sig', 'gbk', 'gb2312', 'latin-1', 'shift-jis', 'cp1252']
+    
+    for encoding in encodings:
+        try:
+            raw.decode(encoding)
+            return encoding
+        except (UnicodeDecodeError, UnicodeError):
+            continue
+    
+    return 'utf-8'  # 默认
+
+
+def column_indices(header, names):
+    """按优先级返回表头中存在的列下标（同名列取最后一列，与 DictReader 一致）"""
+    positions = {name: i for i, name in enumerate(header)}
+    return [positions[name] for name in names if name in positions]
+
+
+def first_value(row, indices):
+    """按列优先级取该行第一个非空值"""
+    for i in indices:
+        if i < len(row) and row[i]:
+            return row[i]
+    return None
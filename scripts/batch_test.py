@@ -4,7 +4,6 @@
 从 CSV 文件读取关键词，调用 API 进行分词和标签标注测试
 """
 import csv
-import json
 import asyncio
 import sys
 from pathlib import Path
@@ -17,20 +16,10 @@ from core.enhanced_pipeline import EnhancedPipeline as TokenizePipeline
 from services.dictionary_manager import DictionaryManager
 from config import settings
 
-
-def detect_encoding(file_path: str) -> str:
-    """检测文件编码"""
-    encodings = ['utf-8', 'utf-8-sig', 'gbk', 'gb2312', 'latin-1', 'shift-jis', 'cp1252']
-    
-    for encoding in encodings:
-        try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                f.read()
-            return encoding
-        except (UnicodeDecodeError, UnicodeError):
-            continue
-    
-    return 'utf-8'  # 默认
+from services.json_io import IO_BUFFER_SIZE
+from _batch_utils import (
+    column_indices, detect_encoding, first_value, progress_reporter, save_json,
+)
 
 
 def load_keywords_from_csv(csv_path: str) -> list:
@@ -41,7 +30,7 @@ def load_keywords_from_csv(csv_path: str) -> list:
     encoding = detect_encoding(csv_path)
     print(f"   检测到文件编码: {encoding}")
     
-    with open(csv_path, 'r', encoding=encoding) as f:
+    with open(csv_path, 'r', encoding=encoding, newline='', buffering=IO_BUFFER_SIZE) as f:
         # 尝试检测分隔符
         sample = f.read(1024)
         f.seek(0)
@@ -51,14 +40,24 @@ def load_keywords_from_csv(csv_path: str) -> list:
         else:
             delimiter = ','
         
-        print(f"   检测到分隔符: {'TAB' if delimiter == '\t' else 'COMMA'}")
+        label = 'TAB' if delimiter == '\t' else 'COMMA'
+        print(f"   检测到分隔符: {label}")
+        
+        # 表头只解析一次，之后按列下标取值（不为每行构造 dict）
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return keywords
         
-        reader = csv.DictReader(f, delimiter=delimiter)
+        # 支持不同的列名
+        keyword_cols = column_indices(header, ('search_term', 'keyword', '关键词'))
+        language_cols = column_indices(header, ('language', '语言'))
         
         for row in reader:
-            # 支持不同的列名
-            keyword = row.get('search_term') or row.get('keyword') or row.get('关键词')
-            language = row.get('language') or row.get('语言') or 'unknown'
+            if not row:
+                continue
+            keyword = first_value(row, keyword_cols)
+            language = first_value(row, language_cols) or 'unknown'
             
             if keyword:
                 keywords.append({
@@ -122,6 +121,8 @@ async def run_batch_test(csv_path: str, output_path: str = None):
     results = []
     success_count = 0
     
+    report = progress_reporter("进度", len(keywords))
+    
     for i, kw in enumerate(keywords):
         result = await test_single_keyword(pipeline, kw['keyword'], kw['language'])
         results.append(result)
@@ -130,8 +131,7 @@ async def run_batch_test(csv_path: str, output_path: str = None):
             success_count += 1
         
         # 打印进度
-        if (i + 1) % 10 == 0 or i == len(keywords) - 1:
-            print(f"   进度: {i + 1}/{len(keywords)} ({(i+1)/len(keywords)*100:.1f}%)")
+        report(i + 1)
     
     # 统计结果
     print("\n" + "=" * 60)
@@ -186,18 +186,17 @@ async def run_batch_test(csv_path: str, output_path: str = None):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_path = f"test_results_{timestamp}.json"
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump({
-            'summary': {
-                'total': len(results),
-                'success': success_count,
-                'failed': len(results) - success_count,
-                'success_rate': success_count / len(results),
-                'language_distribution': lang_counts,
-                'tag_distribution': lang_tags
-            },
-            'results': results
-        }, f, ensure_ascii=False, indent=2)
+    save_json(output_path, {
+        'summary': {
+            'total': len(results),
+            'success': success_count,
+            'failed': len(results) - success_count,
+            'success_rate': success_count / len(results),
+            'language_distribution': lang_counts,
+            'tag_distribution': lang_tags
+        },
+        'results': results
+    })
     
     print(f"\n💾 详细结果已保存到: {output_path}")
     
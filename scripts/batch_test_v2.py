@@ -12,10 +12,14 @@
 import csv
 import json
 import asyncio
+import contextlib
+import io
+import multiprocessing
 import sys
 from pathlib import Path
 from datetime import datetime
-from collections import Counter
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 # 添加项目根目录到 path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -24,18 +28,103 @@ from core.enhanced_pipeline import EnhancedPipeline
 from services.dictionary_manager import DictionaryManager
 from config import settings
 
+from services.json_io import IO_BUFFER_SIZE, orjson
+from _batch_utils import (
+    column_indices, detect_encoding, first_value, progress_reporter, save_json,
+)
 
-def detect_encoding(file_path: str) -> str:
-    """检测文件编码"""
-    encodings = ['utf-8', 'utf-8-sig', 'gbk', 'gb2312', 'latin-1', 'shift-jis', 'cp1252']
-    for encoding in encodings:
-        try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                f.read()
-            return encoding
-        except (UnicodeDecodeError, UnicodeError):
-            continue
-    return 'utf-8'
+
+# 语言名称映射（小写语言名 -> 语言代码）
+LANG_MAP = {
+    '日语': 'ja', '日本語': 'ja', 'japanese': 'ja',
+    '西班牙语': 'es', 'spanish': 'es', 'español': 'es',
+    '德语': 'de', 'german': 'de', 'deutsch': 'de',
+    '法语': 'fr', 'french': 'fr', 'français': 'fr',
+    '英语': 'en', 'english': 'en',
+}
+
+# 阶段1每批交给 pipeline.process_batch 的关键词数量（多进程模式下也是每次派发给子进程的数量）
+PHASE1_BATCH_SIZE = 256
+# 阶段1同时在途的批次数量上限
+PHASE1_CONCURRENCY = 32
+# JSONL 模式下统计信息按块计算的行数
+STATS_CHUNK_SIZE = 10000
+# 每种语言展示的示例结果数
+SAMPLES_PER_LANGUAGE = 2
+# 阶段2同时在途的 AI 批次数量上限，以及相邻批次的最小发起间隔（秒）
+PHASE2_CONCURRENCY = 5
+PHASE2_START_INTERVAL = 0.2
+
+# 命令行用法
+USAGE = "用法: python batch_test_v2.py <csv_file> [-o output.json] [--no-ai] [-j workers] [--jsonl]"
+
+
+def dumps_line(obj) -> bytes:
+    """序列化为一行 JSONL"""
+    if orjson is not None:
+        return orjson.dumps(obj) + b'\n'
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+def loads_line(line: bytes):
+    """解析一行 JSONL"""
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+class SpooledResults:
+    """
+    阶段1结果落盘（JSONL）
+    
+    每个去重后的结果按处理顺序写一行，内存中只保留各行的文件偏移，
+    以及每个输入行对应的结果序号和原始语言名，供阶段3按输入顺序流式读回。
+    """
+    
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, 'wb', buffering=IO_BUFFER_SIZE)
+        self._offsets = []
+        self.row_refs = []  # 输入行 -> 结果序号
+        self.row_languages = []  # 输入行 -> 原始语言名
+    
+    def append(self, result):
+        self._offsets.append(self._file.tell())
+        self._file.write(dumps_line(result))
+    
+    def close(self):
+        self._file.close()
+    
+    def remove(self):
+        self.path.unlink(missing_ok=True)
+    
+    def __len__(self):
+        return len(self.row_refs)
+    
+    def __iter__(self):
+        """按输入行顺序读回结果，每行得到独立的 dict"""
+        with open(self.path, 'rb') as sequential, open(self.path, 'rb') as random_access:
+            next_ref = 0
+            for ref, language in zip(self.row_refs, self.row_languages):
+                if ref == next_ref:
+                    # 首次出现的关键词，结果就是顺序读到的下一行
+                    line = sequential.readline()
+                    next_ref += 1
+                else:
+                    # 重复行，按偏移回读之前的结果
+                    random_access.seek(self._offsets[ref])
+                    line = random_access.readline()
+                result = loads_line(line)
+                result['language'] = language
+                yield result
+
+
+def to_lang_code(language):
+    """CSV 中的语言名转换为语言代码，未知语言名原样（小写）返回，空值返回 None"""
+    if not language:
+        return None
+    language = language.lower()
+    return LANG_MAP.get(language, language)
 
 
 def load_keywords_from_csv(csv_path: str) -> list:
@@ -44,27 +133,31 @@ def load_keywords_from_csv(csv_path: str) -> list:
     encoding = detect_encoding(csv_path)
     print(f"   检测到文件编码: {encoding}")
     
-    with open(csv_path, 'r', encoding=encoding) as f:
+    with open(csv_path, 'r', encoding=encoding, newline='', buffering=IO_BUFFER_SIZE) as f:
         sample = f.read(1024)
         f.seek(0)
         delimiter = '\t' if '\t' in sample else ','
-        print(f"   检测到分隔符: {'TAB' if delimiter == '\t' else 'COMMA'}")
+        label = 'TAB' if delimiter == '\t' else 'COMMA'
+        print(f"   检测到分隔符: {label}")
         
-        reader = csv.DictReader(f, delimiter=delimiter)
+        # 表头只解析一次，之后按列下标取值（不为每行构造 dict）
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return keywords
         
         # 打印列名帮助调试
-        first_row = next(reader, None)
-        if first_row:
-            print(f"   CSV 列名: {list(first_row.keys())}")
-            f.seek(0)
-            reader = csv.DictReader(f, delimiter=delimiter)
+        print(f"   CSV 列名: {header}")
+        
+        # 支持多种列名
+        keyword_cols = column_indices(header, ('search_term', 'keyword', 'Keyword', '关键词'))
+        language_cols = column_indices(header, ('language', 'Language', '语言'))
         
         for row in reader:
-            # 支持多种列名
-            keyword = (row.get('search_term') or row.get('keyword') or 
-                      row.get('Keyword') or row.get('关键词') or '')
-            language = (row.get('language') or row.get('Language') or 
-                       row.get('语言') or 'unknown')
+            if not row:
+                continue
+            keyword = first_value(row, keyword_cols)
+            language = first_value(row, language_cols) or 'unknown'
             
             if keyword:
                 keywords.append({
@@ -75,57 +168,183 @@ def load_keywords_from_csv(csv_path: str) -> list:
     return keywords
 
 
-async def phase1_collect_low_conf(pipeline, keywords):
+async def _process_keywords(pipeline, jobs):
+    """批量处理一组 (关键词, 原始语言, 语言代码)，失败的关键词返回带 error 字段的空结果"""
+    outputs = await pipeline.process_batch(
+        [keyword for keyword, _, _ in jobs],
+        [lang_code for _, _, lang_code in jobs],
+        return_exceptions=True
+    )
+    
+    results = []
+    for (keyword, language, _), result in zip(jobs, outputs):
+        if isinstance(result, Exception):
+            print(f"   ⚠️ 处理失败 [{keyword}]: {result}")
+            result = {
+                'keyword': keyword,
+                'language': language,
+                'tokens': [],
+                'tagged_tokens': [],
+                'error': str(result)
+            }
+        else:
+            result['language'] = language
+        results.append(result)
+    return results
+
+
+def _reuse_result(result, language):
+    """
+    复用重复关键词的处理结果：浅拷贝后改写原始语言名
+    
+    tagged_tokens 等内部结构与首个结果共享，阶段3按词覆盖 AI 标签，
+    对共享的 token 重复写入结果相同。
+    """
+    result = dict(result)
+    result['language'] = language
+    return result
+
+
+# 子进程内的 pipeline 与事件循环（每个 worker 初始化一次）
+_worker_pipeline = None
+_worker_loop = None
+
+
+def _init_phase1_worker(dictionary_path):
+    """子进程初始化：加载词典并构建 pipeline"""
+    global _worker_pipeline, _worker_loop
+    with contextlib.redirect_stdout(io.StringIO()):  # 不重复打印词典加载信息
+        dict_manager = DictionaryManager(dictionary_path)
+        dict_manager.load_all()
+    _worker_pipeline = EnhancedPipeline(dict_manager, enable_ai=False)
+    _worker_loop = asyncio.new_event_loop()
+
+
+def _phase1_process_batch(jobs):
+    """子进程任务：同步执行一批关键词的处理"""
+    return _worker_loop.run_until_complete(_process_keywords(_worker_pipeline, jobs))
+
+
+async def phase1_collect_low_conf(pipeline, keywords, workers=1, spool=None):
     """
     第一阶段：处理所有关键词，收集低置信度词
+
+    重复的 (关键词, 语言代码) 只处理一次，结果再按位置分发回各行。
+    workers > 1 时用多进程处理（pipeline 不调用 AI 时主要是 CPU 计算，
+    多进程才能绕开 GIL）；否则在事件循环内并发处理（信号量限制同时在途数量）。
+    结果按输入顺序返回；低置信度词按输入顺序统计，保证输出稳定。
+    
+    传入 spool（SpooledResults）时结果边处理边落盘，不在内存中保留，
+    返回值中的结果列表即为 spool，token 索引为 None。
     """
-    results = []
     low_conf_words = Counter()  # 统计低置信度词出现次数
     
-    # 语言名称映射
-    lang_map = {
-        '日语': 'ja', '日本語': 'ja', 'japanese': 'ja',
-        '西班牙语': 'es', 'spanish': 'es', 'español': 'es',
-        '德语': 'de', 'german': 'de', 'deutsch': 'de',
-        '法语': 'fr', 'french': 'fr', 'français': 'fr',
-        '英语': 'en', 'english': 'en',
-    }
-    
-    total = len(keywords)
-    
+    # (关键词, 语言代码) -> 出现的行号；jobs 按首次出现顺序保存 (关键词, 原始语言, 语言代码)
+    by_key = defaultdict(list)
+    jobs = []
+    lang_codes = {}  # 原始语言名 -> 语言代码（不同语言名很少，每个只转换一次）
     for i, item in enumerate(keywords):
-        if (i + 1) % 500 == 0:
-            print(f"   阶段1进度: {i+1}/{total} ({(i+1)/total*100:.1f}%)")
-        
         keyword = item['keyword']
         language = item['language']
+        if language in lang_codes:
+            lang_code = lang_codes[language]
+        else:
+            lang_code = lang_codes[language] = to_lang_code(language)
+        positions = by_key[(keyword, lang_code)]
+        if not positions:
+            jobs.append((keyword, language, lang_code))
+        positions.append(i)
+    
+    total = len(jobs)
+    if total < len(keywords):
+        print(f"   去重后 {total} 条（重复 {len(keywords) - total} 条）")
+    
+    report = progress_reporter("阶段1进度", total)
+    
+    # 按批交给 pipeline.process_batch，每批只需一次调度
+    batches = [jobs[i:i + PHASE1_BATCH_SIZE] for i in range(0, total, PHASE1_BATCH_SIZE)]
+    repeats = [len(by_key[(keyword, lang_code)]) for keyword, _, lang_code in jobs]  # 各结果的重复行数
+    
+    async def ordered_batches():
+        """按批次顺序产出各批结果"""
+        if workers > 1:
+            # 用 spawn 启动子进程：父进程的 pipeline 已在后台线程中加载 jieba，
+            # fork 会让子进程继承加载中持有的锁
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_phase1_worker,
+                initargs=(str(pipeline.dict_manager.dictionary_path),),
+            ) as executor:
+                for batch_results in executor.map(_phase1_process_batch, batches):
+                    yield batch_results
+            return
         
-        # 转换语言代码
-        lang_code = lang_map.get(language.lower(), language.lower()) if language else None
+        sem = asyncio.Semaphore(PHASE1_CONCURRENCY)
         
-        try:
-            result = await pipeline.process(keyword, language=lang_code)
-            result['language'] = language
-            results.append(result)
-            
-            # 收集低置信度词
+        async def worker(i, batch):
+            async with sem:
+                return i, await _process_keywords(pipeline, batch)
+        
+        tasks = [asyncio.ensure_future(worker(i, batch)) for i, batch in enumerate(batches)]
+        
+        # 先完成的批次暂存，等前面的批次都到齐后按顺序产出
+        pending = {}
+        next_batch = 0
+        for future in asyncio.as_completed(tasks):
+            i, batch_results = await future
+            pending[i] = batch_results
+            while next_batch in pending:
+                yield pending.pop(next_batch)
+                next_batch += 1
+    
+    # 收集低置信度词（按重复次数计数）
+    unique_results = []
+    done = 0
+    async for batch_results in ordered_batches():
+        for result in batch_results:
+            repeat = repeats[done]
+            done += 1
             for token in result.get('tagged_tokens', []):
                 if token.get('confidence', 0) <= 0.5:
                     word = token.get('token', '')
                     if len(word) > 1:  # 跳过单字符
-                        low_conf_words[word] += 1
-                        
-        except Exception as e:
-            print(f"   ⚠️ 处理失败 [{keyword}]: {e}")
-            results.append({
-                'keyword': keyword,
-                'language': language,
-                'tokens': [],
-                'tagged_tokens': [],
-                'error': str(e)
-            })
+                        low_conf_words[word] += repeat
+            
+            if spool is not None:
+                spool.append(result)
+            else:
+                unique_results.append(result)
+        report(done)
+    
+    if spool is not None:
+        spool.close()
+        row_refs = [0] * len(keywords)
+        for j, (keyword, _, lang_code) in enumerate(jobs):
+            for i in by_key[(keyword, lang_code)]:
+                row_refs[i] = j
+        spool.row_refs = row_refs
+        spool.row_languages = [item['language'] for item in keywords]
+        return spool, low_conf_words, None
+    
+    # 分发回各行
+    results = [None] * len(keywords)
+    for (keyword, _, lang_code), result in zip(jobs, unique_results):
+        positions = by_key[(keyword, lang_code)]
+        results[positions[0]] = result
+        for i in positions[1:]:
+            results[i] = _reuse_result(result, keywords[i]['language'])
+    
+    # 低置信度词在所有结果中出现的 token（含其他位置置信度较高的同一个词），
+    # 阶段3只需回写这些 token，不必再遍历全部结果
+    token_refs = defaultdict(list)  # 词 -> [(token dict, 重复行数)]
+    for result, repeat in zip(unique_results, repeats):
+        for token in result.get('tagged_tokens', []):
+            word = token.get('token', '')
+            if word in low_conf_words:
+                token_refs[word].append((token, repeat))
     
-    return results, low_conf_words
+    return results, low_conf_words, token_refs
 
 
 async def phase2_ai_batch_tagging(low_conf_words, min_count=2):
@@ -150,81 +369,179 @@ async def phase2_ai_batch_tagging(low_conf_words, min_count=2):
     if not words_to_tag:
         return {}
     
-    # 分批处理（每批 50 个词）
+    # 分批处理（每批 50 个词），多批并发请求
     batch_size = 50
+    batches = [words_to_tag[i:i + batch_size] for i in range(0, len(words_to_tag), batch_size)]
+    sem = asyncio.Semaphore(PHASE2_CONCURRENCY)
+    
+    async def run_batch(index, batch):
+        # 按序号错开发起时间，避免 API 限流
+        await asyncio.sleep(index * PHASE2_START_INTERVAL)
+        async with sem:
+            print(f"   AI 标注批次 {index + 1}/{len(batches)}: {len(batch)} 词")
+            return await enhancer.process_batch(batch, context="电商关键词")
+    
+    batch_results = await asyncio.gather(
+        *(run_batch(i, batch) for i, batch in enumerate(batches)),
+        return_exceptions=True
+    )
+    
+    # 按批次顺序合并
     all_results = {}
-    
-    for i in range(0, len(words_to_tag), batch_size):
-        batch = words_to_tag[i:i + batch_size]
-        print(f"   AI 标注批次 {i//batch_size + 1}/{(len(words_to_tag) + batch_size - 1)//batch_size}: {len(batch)} 词")
-        
-        try:
-            results = await enhancer.process_batch(batch, context="电商关键词")
-            all_results.update(results)
-            
-            # 避免 API 限流
-            await asyncio.sleep(1)
-        except Exception as e:
-            print(f"   ⚠️ AI 批量标注失败: {e}")
+    for results in batch_results:
+        if isinstance(results, Exception):
+            print(f"   ⚠️ AI 批量标注失败: {results}")
+            continue
+        all_results.update(results)
     
     return all_results
 
 
-def phase3_merge_results(results, ai_tags):
+def phase3_merge_results(results, ai_tags, token_refs=None):
     """
     第三阶段：合并 AI 标注结果
+    
+    token_refs 为阶段1建立的 词 -> [(token, 重复行数)] 索引，只覆盖低置信度词；
+    AI 返回了索引之外的词时退回逐个遍历全部结果。
     """
     if not ai_tags:
         return results
     
     updated_count = 0
     
-    for result in results:
-        for token in result.get('tagged_tokens', []):
-            word = token.get('token', '')
-            if word in ai_tags:
-                ai_result = ai_tags[word]
+    if token_refs is not None and all(word in token_refs for word in ai_tags):
+        for word, ai_result in ai_tags.items():
+            for token, repeat in token_refs[word]:
                 token['tags'] = [ai_result['tag']]
                 token['confidence'] = ai_result['confidence']
                 token['method'] = 'ai'
-                updated_count += 1
+                updated_count += repeat
+        
+        print(f"   已更新 {updated_count} 个 token 的标注")
+        return results
+    
+    for result in results:
+        updated_count += _apply_ai_tags(result, ai_tags)
     
     print(f"   已更新 {updated_count} 个 token 的标注")
     return results
 
 
-def compute_statistics(results):
-    """计算统计信息"""
-    stats = {
-        'total': len(results),
-        'success': sum(1 for r in results if 'error' not in r),
-        'language_distribution': Counter(),
-        'tag_distribution': {},
-        'confidence_distribution': Counter(),
-    }
+def _apply_ai_tags(result, ai_tags):
+    """用 AI 标注覆盖单个结果中的 token，返回更新的 token 数"""
+    updated_count = 0
+    for token in result.get('tagged_tokens', []):
+        word = token.get('token', '')
+        if word in ai_tags:
+            ai_result = ai_tags[word]
+            token['tags'] = [ai_result['tag']]
+            token['confidence'] = ai_result['confidence']
+            token['method'] = 'ai'
+            updated_count += 1
+    return updated_count
+
+
+def phase3_write_jsonl(spooled, ai_tags, output_path):
+    """
+    第三阶段（JSONL 模式）：按输入顺序流式读回阶段1结果，合并 AI 标注后逐行写出
     
-    for result in results:
-        lang = result.get('language', 'unknown')
-        stats['language_distribution'][lang] += 1
-        
-        if lang not in stats['tag_distribution']:
-            stats['tag_distribution'][lang] = Counter()
-        
-        for token in result.get('tagged_tokens', []):
-            tag = token.get('tags', ['未知'])[0]
-            conf = round(token.get('confidence', 0), 2)
-            
-            stats['tag_distribution'][lang][tag] += 1
-            stats['confidence_distribution'][conf] += 1
+    统计信息按块计算后合并，示例结果在写出时顺带收集，全程不把结果整体放进内存。
     
-    stats['success_rate'] = stats['success'] / stats['total'] if stats['total'] > 0 else 0
+    Returns:
+        (统计信息, 示例结果)
+    """
+    updated_count = 0
+    stats = None
+    samples = {}
+    chunk = []
+    
+    with open(output_path, 'wb', buffering=IO_BUFFER_SIZE) as f:
+        for result in spooled:
+            if ai_tags:
+                updated_count += _apply_ai_tags(result, ai_tags)
+            f.write(dumps_line(result))
+            
+            lang_samples = samples.setdefault(result.get('language'), [])
+            if len(lang_samples) < SAMPLES_PER_LANGUAGE:
+                lang_samples.append(result)
+            
+            chunk.append(result)
+            if len(chunk) >= STATS_CHUNK_SIZE:
+                stats = merge_statistics(stats, compute_statistics(chunk))
+                chunk = []
     
-    # 转换 Counter 为普通 dict
-    stats['language_distribution'] = dict(stats['language_distribution'])
-    stats['tag_distribution'] = {k: dict(v) for k, v in stats['tag_distribution'].items()}
-    stats['confidence_distribution'] = dict(stats['confidence_distribution'])
+    stats = merge_statistics(stats, compute_statistics(chunk))
     
-    return stats
+    if ai_tags:
+        print(f"   已更新 {updated_count} 个 token 的标注")
+    return stats, samples
+
+
+def compute_statistics(results):
+    """计算统计信息"""
+    total = len(results)
+    success = sum(1 for r in results if 'error' not in r)
+    
+    # 先把所有 token 及其所属语言摊平成两个并列列表，再交给 Counter 在 C 层计数
+    # （Counter 保持首次出现顺序，与逐个累加的结果一致）
+    language_distribution = Counter(r.get('language', 'unknown') for r in results)
+    tokens = []
+    token_langs = []
+    for r in results:
+        tagged_tokens = r.get('tagged_tokens', [])
+        if tagged_tokens:
+            tokens += tagged_tokens
+            token_langs += [r.get('language', 'unknown')] * len(tagged_tokens)
+    
+    tag_counts = Counter(zip(token_langs, [t.get('tags', ['未知'])[0] for t in tokens]))
+    
+    # 置信度先按原值计数，再对不同取值做一次 round 合并
+    confidence_distribution = {}
+    for conf, count in Counter([t.get('confidence', 0) for t in tokens]).items():
+        conf = round(conf, 2)
+        confidence_distribution[conf] = confidence_distribution.get(conf, 0) + count
+    
+    tag_distribution = {lang: {} for lang in language_distribution}
+    for (lang, tag), count in tag_counts.items():
+        tag_distribution[lang][tag] = count
+    
+    return {
+        'total': total,
+        'success': success,
+        'language_distribution': dict(language_distribution),
+        'tag_distribution': tag_distribution,
+        'confidence_distribution': confidence_distribution,
+        'success_rate': success / total if total > 0 else 0,
+    }
+
+
+def merge_statistics(total, part):
+    """合并两份 compute_statistics 的结果（total 为 None 时直接返回 part）"""
+    if total is None:
+        return part
+    
+    total['total'] += part['total']
+    total['success'] += part['success']
+    for key in ('language_distribution', 'confidence_distribution'):
+        merged = total[key]
+        for k, count in part[key].items():
+            merged[k] = merged.get(k, 0) + count
+    for lang, tags in part['tag_distribution'].items():
+        merged = total['tag_distribution'].setdefault(lang, {})
+        for tag, count in tags.items():
+            merged[tag] = merged.get(tag, 0) + count
+    total['success_rate'] = total['success'] / total['total'] if total['total'] > 0 else 0
+    return total
+
+
+def collect_samples(results):
+    """每种语言取前几条结果作为示例"""
+    samples = {}
+    for result in results:
+        lang_samples = samples.setdefault(result.get('language'), [])
+        if len(lang_samples) < SAMPLES_PER_LANGUAGE:
+            lang_samples.append(result)
+    return samples
 
 
 async def main():
@@ -234,22 +551,35 @@ async def main():
     
     # 解析参数
     if len(sys.argv) < 2:
-        print("用法: python batch_test_v2.py <csv_file> [-o output.json] [--no-ai]")
+        print(USAGE)
         sys.exit(1)
     
     csv_path = sys.argv[1]
     output_path = None
     use_ai = True
+    workers = 1
+    jsonl = False
     
     for i, arg in enumerate(sys.argv):
         if arg == '-o' and i + 1 < len(sys.argv):
             output_path = sys.argv[i + 1]
+        if arg == '-j' and i + 1 < len(sys.argv):
+            try:
+                workers = int(sys.argv[i + 1])
+            except ValueError:
+                workers = 0
+            if workers < 1:
+                print(f"-j 需要正整数，收到: {sys.argv[i + 1]}")
+                print(USAGE)
+                sys.exit(1)
         if arg == '--no-ai':
             use_ai = False
+        if arg == '--jsonl':
+            jsonl = True
     
     if not output_path:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_path = f"test_results_{timestamp}.json"
+        output_path = f"test_results_{timestamp}.{'jsonl' if jsonl else 'json'}"
     
     # 加载关键词
     print(f"\n📂 加载关键词文件: {csv_path}")
@@ -270,29 +600,45 @@ async def main():
     
     # 阶段1：处理所有关键词
     print(f"\n🔄 阶段1: 处理关键词（不使用 AI）...")
-    results, low_conf_words = await phase1_collect_low_conf(pipeline, keywords)
-    
-    print(f"   处理完成，共发现 {len(low_conf_words)} 个不同的低置信度词")
-    print(f"   高频低置信度词 (Top 10):")
-    for word, count in low_conf_words.most_common(10):
-        print(f"      {word}: {count}次")
-    
-    # 阶段2：AI 批量标注
-    ai_tags = {}
-    if use_ai:
-        print(f"\n🤖 阶段2: AI 批量标注...")
-        ai_tags = await phase2_ai_batch_tagging(low_conf_words, min_count=2)
-        print(f"   AI 标注完成，共 {len(ai_tags)} 个词")
-    else:
-        print(f"\n⏭️ 跳过 AI 标注 (--no-ai)")
-    
-    # 阶段3：合并结果
-    print(f"\n📝 阶段3: 合并结果...")
-    results = phase3_merge_results(results, ai_tags)
-    
-    # 计算统计
-    print(f"\n📊 计算统计信息...")
-    stats = compute_statistics(results)
+    if workers > 1:
+        print(f"   使用 {workers} 个进程")
+    # JSONL 模式：阶段1结果落盘，不在内存中保留
+    spool = SpooledResults(f"{output_path}.phase1") if jsonl else None
+    try:
+        results, low_conf_words, token_refs = await phase1_collect_low_conf(
+            pipeline, keywords, workers=workers, spool=spool
+        )
+        
+        print(f"   处理完成，共发现 {len(low_conf_words)} 个不同的低置信度词")
+        print(f"   高频低置信度词 (Top 10):")
+        for word, count in low_conf_words.most_common(10):
+            print(f"      {word}: {count}次")
+        
+        # 阶段2：AI 批量标注
+        ai_tags = {}
+        if use_ai:
+            print(f"\n🤖 阶段2: AI 批量标注...")
+            ai_tags = await phase2_ai_batch_tagging(low_conf_words, min_count=2)
+            print(f"   AI 标注完成，共 {len(ai_tags)} 个词")
+        else:
+            print(f"\n⏭️ 跳过 AI 标注 (--no-ai)")
+        
+        # 阶段3：合并结果
+        print(f"\n📝 阶段3: 合并结果...")
+        if spool is not None:
+            stats, samples = phase3_write_jsonl(spool, ai_tags, output_path)
+        else:
+            results = phase3_merge_results(results, ai_tags, token_refs)
+            
+            # 计算统计
+            print(f"\n📊 计算统计信息...")
+            stats = compute_statistics(results)
+            samples = collect_samples(results)
+    finally:
+        # 无论成功与否都清理阶段1的临时文件（中途出错或 Ctrl+C 时也不留下）
+        if spool is not None:
+            spool.close()
+            spool.remove()
     
     # 置信度统计
     total_tokens = sum(stats['confidence_distribution'].values())
@@ -308,16 +654,24 @@ async def main():
         print(f"   ⚠️ 无数据")
     
     # 保存结果
-    output = {
-        'summary': stats,
-        'ai_tags_count': len(ai_tags),
-        'results': results
-    }
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
-    
-    print(f"\n✅ 结果已保存到: {output_path}")
+    if spool is not None:
+        # 结果已逐行写入 JSONL，统计信息另存
+        summary_path = f"{output_path}.summary.json"
+        save_json(summary_path, {
+            'summary': stats,
+            'ai_tags_count': len(ai_tags),
+        })
+        print(f"\n✅ 结果已保存到: {output_path}（统计信息: {summary_path}）")
+    else:
+        output = {
+            'summary': stats,
+            'ai_tags_count': len(ai_tags),
+            'results': results
+        }
+        
+        save_json(output_path, output)
+        
+        print(f"\n✅ 结果已保存到: {output_path}")
     
     # 示例结果
     print(f"\n" + "=" * 60)
@@ -325,8 +679,7 @@ async def main():
     print("=" * 60)
     
     for lang in ['日语', '德语', '法语', '英语', '西班牙语']:
-        samples = [r for r in results if r.get('language') == lang][:2]
-        for s in samples:
+        for s in samples.get(lang, []):
             # 从 tokens 或 original 获取关键词
             kw = s.get('original', '')
             if not kw and s.get('tokens'):
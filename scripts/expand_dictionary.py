@@ -3,16 +3,22 @@
 词典扩充脚本
 从测试结果中提取低置信度词，使用 AI 批量标注，然后更新词典
 """
-import json
+import re
 import asyncio
 import sys
 from pathlib import Path
 from collections import defaultdict
+from functools import lru_cache
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from services.dictionary_manager import DictionaryManager
+from services.dictionary_manager import DICT_FILES, DictionaryManager
 from config import settings
+from services.json_io import iter_results, loads_json, read_json
+
+# AI 返回内容中的代码块（未闭合时取到末尾）
+_JSON_FENCE_PATTERN = re.compile(r'```json(.*?)(?:```|\Z)', re.S)
+_FENCE_PATTERN = re.compile(r'```(.*?)(?:```|\Z)', re.S)
 
 
 def extract_low_confidence_words(results_file: str, threshold: float = 0.6) -> dict:
@@ -22,12 +28,9 @@ def extract_low_confidence_words(results_file: str, threshold: float = 0.6) -> d
     Returns:
         {"日语": ["word1", "word2"], "德语": [...], ...}
     """
-    with open(results_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
     low_conf_words = defaultdict(set)
     
-    for result in data.get('results', []):
+    for result in iter_results(results_file):
         language = result.get('language', 'unknown')
         
         for tagged in result.get('tagged_tokens', []):
@@ -99,58 +102,71 @@ def print_manual_prompt(language: str, words: list):
 
 def parse_ai_response(response_text: str) -> dict:
     """解析 AI 返回的 JSON"""
-    # 提取 JSON 部分
-    if "```json" in response_text:
-        response_text = response_text.split("```json")[1].split("```")[0]
-    elif "```" in response_text:
-        response_text = response_text.split("```")[1].split("```")[0]
+    # 提取 JSON 部分（优先 ```json 代码块，其次任意代码块）
+    match = _JSON_FENCE_PATTERN.search(response_text) or _FENCE_PATTERN.search(response_text)
+    if match:
+        response_text = match.group(1)
     
-    return json.loads(response_text.strip())
+    return loads_json(response_text.strip())
+
+
+# 标签 -> 词典名
+TAG_TO_DICT = {
+    "品牌词": "brands",
+    "商品词": "products", 
+    "人群词": "audiences",
+    "场景词": "scenarios",
+    "颜色词": "colors",
+    "卖点词": "features",
+    "属性词": "attributes",
+    "尺寸词": "attributes",  # 尺寸词也放属性
+}
+
+# 语言名 -> 语言代码（品牌词按语言区分词典）
+LANG_CODE = {
+    "日语": "ja",
+    "德语": "de", 
+    "法语": "fr",
+    "西班牙语": "es",
+    "中文": "zh"
+}
+
+
+@lru_cache(maxsize=None)
+def resolve_dict_name(tag: str, language: str) -> str:
+    """根据标签和语言确定目标词典名"""
+    dict_name = TAG_TO_DICT.get(tag, "attributes")
+    
+    # 品牌词需要区分语言（没有该语言品牌词典文件时仍写入全局品牌词典）
+    if dict_name == "brands" and language != "英语":
+        lang_code = LANG_CODE.get(language, "global")
+        
+        if f"brands_{lang_code}" in DICT_FILES:
+            dict_name = f"brands_{lang_code}"
+    
+    return dict_name
 
 
 def update_dictionaries(tagged_words: dict, language: str, dict_manager: DictionaryManager):
     """更新词典"""
-    tag_to_dict = {
-        "品牌词": "brands",
-        "商品词": "products", 
-        "人群词": "audiences",
-        "场景词": "scenarios",
-        "颜色词": "colors",
-        "卖点词": "features",
-        "属性词": "attributes",
-        "尺寸词": "attributes",  # 尺寸词也放属性
-    }
-    
-    added_count = 0
+    entries = []
     
     for word, info in tagged_words.items():
         tag = info.get("tag", "属性词")
         confidence = info.get("confidence", 0.8)
         
-        dict_name = tag_to_dict.get(tag, "attributes")
-        
-        # 品牌词需要区分语言
-        if dict_name == "brands" and language != "英语":
-            lang_code = {
-                "日语": "ja",
-                "德语": "de", 
-                "法语": "fr",
-                "西班牙语": "es",
-                "中文": "zh"
-            }.get(language, "global")
-            
-            if lang_code != "global":
-                dict_name = f"brands_{lang_code}"
-        
-        dict_manager.add_entry(
-            word=word,
-            tag=tag,
-            confidence=confidence,
-            source="ai_generated"
-        )
-        added_count += 1
+        entries.append({
+            "word": word,
+            "tag": tag,
+            "confidence": confidence,
+            "source": "ai_generated",
+            "dict_name": resolve_dict_name(tag, language)
+        })
+    
+    # 批量写入，每个词典文件只保存一次
+    dict_manager.add_entries(entries)
     
-    return added_count
+    return len(entries)
 
 
 def interactive_mode():
@@ -194,7 +210,7 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='词典扩充工具')
-    parser.add_argument('results_file', nargs='?', help='测试结果 JSON 文件')
+    parser.add_argument('results_file', nargs='?', help='测试结果 JSON/JSONL 文件')
     parser.add_argument('-t', '--threshold', type=float, default=0.6, 
                         help='置信度阈值，低于此值的词需要标注（默认 0.6）')
     parser.add_argument('-l', '--language', help='只处理指定语言')
@@ -212,8 +228,7 @@ def main():
     # 应用结果文件
     if args.apply:
         print(f"📂 加载标注结果: {args.apply}")
-        with open(args.apply, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = read_json(args.apply)
         
         dict_manager = DictionaryManager(settings.dictionary_path)
         dict_manager.load_all()
@@ -4,11 +4,17 @@
 
 使用方法:
     python scripts/expand_from_results.py test_results.json
+    python scripts/expand_from_results.py test_results.jsonl   # batch_test_v2 --jsonl 的输出
 """
-import json
+import re
 import sys
 from pathlib import Path
-from collections import Counter
+from collections import Counter, defaultdict
+
+# 添加项目根目录到 path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.json_io import iter_results, read_json, write_json
 
 # 项目根目录
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -16,34 +22,52 @@ DICT_PATH = PROJECT_ROOT / "dictionaries"
 
 
 def load_results(filepath):
-    """加载测试结果"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    """逐条读取测试结果中的 results"""
+    return iter_results(filepath)
 
 
-def collect_low_conf_words(data, min_count=3):
-    """收集高频低置信度词"""
-    by_language = {}
+def collect_low_conf_words(results, min_count=3, languages=None):
+    """
+    收集高频低置信度词
+    
+    Args:
+        languages: 只统计这些语言（None 表示全部），其他语言的结果只计入条数
+    
+    Returns:
+        (按语言分组的 {词: 次数}, 结果条数)
+    """
+    by_language = defaultdict(Counter)
+    result_count = 0
     
-    for result in data.get('results', []):
+    for result in results:
+        result_count += 1
         lang = result.get('language', 'unknown')
-        if lang not in by_language:
-            by_language[lang] = Counter()
+        if languages is not None and lang not in languages:
+            continue
+        counter = by_language[lang]
         
         for token in result.get('tagged_tokens', []):
             if token.get('confidence', 0) <= 0.5:
                 word = token.get('token', '')
                 if len(word) > 1:
-                    by_language[lang][word] += 1
+                    counter[word] += 1
     
-    # 过滤低频词
-    for lang in by_language:
-        by_language[lang] = {
-            w: c for w, c in by_language[lang].items() 
-            if c >= min_count
-        }
+    # 过滤低频词（原地删除，不再构建新字典）
+    for counter in by_language.values():
+        for word in [w for w, c in counter.items() if c < min_count]:
+            del counter[word]
     
-    return by_language
+    return by_language, result_count
+
+
+# 日语商品词后缀（词中包含任一后缀即视为商品词），合成一个正则一次扫描
+_JA_PRODUCT_SUFFIXES = ('リュック', 'バッグ', 'シューズ', 'ベスト', 'パンツ',
+                        'ザック', 'ポーチ', 'ケース', 'ボトル', 'ジャケット',
+                        'コート', 'シャツ')
+_JA_PRODUCT_PATTERN = re.compile('|'.join(map(re.escape, _JA_PRODUCT_SUFFIXES)))
+
+# 日语噪音词（归入属性词）
+_JA_NOISE_WORDS = frozenset(['付き', 'れない', '多い', '通せる', '軽い'])
 
 
 def categorize_japanese(words):
@@ -55,15 +79,12 @@ def categorize_japanese(words):
         'attributes': [],
     }
     
-    product_suffixes = ['リュック', 'バッグ', 'シューズ', 'ベスト', 'パンツ', 
-                        'ザック', 'ポーチ', 'ケース', 'ボトル', 'ジャケット',
-                        'コート', 'シャツ']
     scenario_prefixes = ['ランニング', 'ハイキング', 'トレッキング', 'アウトドア',
                          'キャンプ', 'トレイル', 'マラソン', 'ジョギング', 'ウォーキング']
     
     for word, count in words.items():
         # 商品词（包含商品后缀）
-        if any(suffix in word for suffix in product_suffixes):
+        if _JA_PRODUCT_PATTERN.search(word):
             # 检查是否是复合商品词（场景+商品）
             categories['products'].append({
                 'word': word,
@@ -71,7 +92,7 @@ def categorize_japanese(words):
                 'confidence': 0.85
             })
         # 跳过一些噪音词
-        elif word in ['付き', 'れない', '多い', '通せる', '軽い']:
+        elif word in _JA_NOISE_WORDS:
             categories['attributes'].append({
                 'word': word,
                 'count': count,
@@ -81,6 +102,10 @@ def categorize_japanese(words):
     return categories
 
 
+# 西班牙语形容词常见词尾（-o/-a）
+_ES_ADJECTIVE_ENDINGS = frozenset('oa')
+
+
 def categorize_spanish(words):
     """分类西班牙语词"""
     categories = {
@@ -113,7 +138,7 @@ def categorize_spanish(words):
         elif word in scenario_words:
             categories['scenarios'].append(entry)
         # 如果词以 -o/-a 结尾，可能是形容词
-        elif word.endswith('o') or word.endswith('a'):
+        elif word[-1:] in _ES_ADJECTIVE_ENDINGS:
             categories['attributes'].append(entry)
     
     return categories
@@ -156,34 +181,70 @@ def categorize_french(words):
     return categories
 
 
-def update_dictionary(dict_name, new_entries, dry_run=True):
-    """更新词典文件"""
+# 语言 -> 分类函数（没有分类函数的语言不统计）
+CATEGORIZERS = {
+    '日语': categorize_japanese,
+    '西班牙语': categorize_spanish,
+    '德语': categorize_german,
+    '法语': categorize_french,
+}
+
+
+class DictStore:
+    """
+    词典文件缓存：每个文件只读一次，修改过的文件在 flush 时统一写回一次
+    
+    多种语言的分类结果可能写入同一个词典文件（如 products.json），
+    不必每次都重新读取、整文件重写。
+    """
+    
+    def __init__(self):
+        self._cache = {}  # 路径 -> (词典数据, 已有词小写集合)
+        self._dirty = set()
+    
+    def get(self, path):
+        """获取词典数据和已有词集合（首次访问时读取文件）"""
+        if path not in self._cache:
+            data = read_json(path)
+            existing_words = {e.get('word', '').lower() for e in data.get('entries', [])}
+            self._cache[path] = (data, existing_words)
+        return self._cache[path]
+    
+    def add(self, path, entry, word_lower):
+        """向缓存中的词典添加条目（word_lower 为调用方已算好的小写词），标记为待写回"""
+        data, existing_words = self.get(path)
+        data['entries'].append(entry)
+        existing_words.add(word_lower)
+        self._dirty.add(path)
+    
+    def flush(self):
+        """把修改过的词典写回文件"""
+        for path in self._dirty:
+            write_json(path, self._cache[path][0])
+        self._dirty.clear()
+
+
+def update_dictionary(store, dict_name, new_entries, dry_run=True):
+    """更新词典（写入 store 缓存，由调用方统一 flush）"""
     dict_file = DICT_PATH / f"{dict_name}.json"
     
     if not dict_file.exists():
         print(f"  ⚠️ 词典文件不存在: {dict_file}")
         return 0
     
-    with open(dict_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    existing_words = {e.get('word', '').lower() for e in data.get('entries', [])}
+    _, existing_words = store.get(dict_file)
     
     added = 0
     for entry in new_entries:
         word = entry['word']
-        if word.lower() not in existing_words:
-            data['entries'].append({
-                'word': word,
-                'confidence': entry.get('confidence', 0.85)
-            })
+        word_lower = word.lower()
+        if word_lower not in existing_words:
             added += 1
             if not dry_run:
-                existing_words.add(word.lower())
-    
-    if not dry_run and added > 0:
-        with open(dict_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+                store.add(dict_file, {
+                    'word': word,
+                    'confidence': entry.get('confidence', 0.85)
+                }, word_lower)
     
     return added
 
@@ -201,15 +262,15 @@ def main():
     else:
         print("⚡ 执行模式\n")
     
-    # 加载结果
-    data = load_results(results_file)
-    print(f"📂 已加载 {len(data.get('results', []))} 条结果\n")
-    
-    # 收集低置信度词
-    by_language = collect_low_conf_words(data, min_count=3)
+    # 加载结果并收集低置信度词（边读边统计）
+    by_language, result_count = collect_low_conf_words(
+        load_results(results_file), min_count=3, languages=CATEGORIZERS
+    )
+    print(f"📂 已加载 {result_count} 条结果\n")
     
     # 按语言处理
     total_added = 0
+    store = DictStore()
     
     for lang, words in by_language.items():
         if not words:
@@ -218,23 +279,14 @@ def main():
         print(f"=== {lang} ({len(words)} 个高频低置信度词) ===")
         
         # 分类
-        if lang == '日语':
-            categories = categorize_japanese(words)
-        elif lang == '西班牙语':
-            categories = categorize_spanish(words)
-        elif lang == '德语':
-            categories = categorize_german(words)
-        elif lang == '法语':
-            categories = categorize_french(words)
-        else:
-            continue
+        categories = CATEGORIZERS[lang](words)
         
         # 更新词典
         for cat, entries in categories.items():
             if not entries:
                 continue
             
-            count = update_dictionary(cat, entries, dry_run)
+            count = update_dictionary(store, cat, entries, dry_run)
             if count > 0:
                 print(f"  {cat}: +{count} 词")
                 for e in entries[:5]:
@@ -245,6 +297,10 @@ def main():
         
         print()
     
+    # 所有语言处理完后统一写回
+    if not dry_run:
+        store.flush()
+    
     print(f"{'预计' if dry_run else '已'}添加 {total_added} 个词")
     
     if dry_run:
@@ -8,7 +8,6 @@
 用法:
     python scripts/import_ai_tags.py test_results_ai.json [--dry-run]
 """
-import json
 import sys
 from pathlib import Path
 from collections import defaultdict
@@ -17,6 +16,8 @@ from typing import Dict, List, Tuple
 # 添加项目路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from services.json_io import iter_results, read_json, write_json
+
 # 标签到词典文件的映射
 TAG_TO_DICT = {
     "品牌词": "brands/global.json",
@@ -61,14 +62,11 @@ def load_results(json_path: str) -> Tuple[Dict[str, List[Tuple[str, float]]], Di
         ai_tagged: {tag: [(word, confidence), ...]}
         word_counts: {word: count}
     """
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
     ai_tagged = defaultdict(list)
     word_counts = defaultdict(int)
     seen_words = set()
     
-    for result in data.get('results', []):
+    for result in iter_results(json_path):
         for token in result.get('tagged_tokens', []):
             if token.get('method') == 'ai':
                 word = token.get('token', '').strip()
@@ -116,8 +114,7 @@ def filter_words(
 def load_existing_dict(dict_path: Path) -> Tuple[dict, set]:
     """加载现有词典"""
     if dict_path.exists():
-        with open(dict_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = read_json(dict_path)
         existing_words = {e.get('word', '').lower() for e in data.get('entries', [])}
         return data, existing_words
     return {"entries": []}, set()
@@ -126,8 +123,7 @@ def load_existing_dict(dict_path: Path) -> Tuple[dict, set]:
 def save_dict(dict_path: Path, data: dict):
     """保存词典"""
     dict_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(dict_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    write_json(dict_path, data)
 
 
 def import_to_dicts(
@@ -138,34 +134,26 @@ def import_to_dicts(
     """导入到词典"""
     stats = defaultdict(int)
     
-    # 按目标词典分组
+    # 按目标词典分组（每个标签只查一次映射，词以 (word, conf) 元组分组）
     by_dict = defaultdict(list)
     for tag, words in filtered.items():
-        dict_file = TAG_TO_DICT.get(tag, "attributes.json")
-        for word, conf in words:
-            by_dict[dict_file].append({
-                "word": word,
-                "confidence": round(conf, 2),
-                "source": "ai_generated",
-                "original_tag": tag
-            })
+        by_dict[TAG_TO_DICT.get(tag, "attributes.json")].extend(words)
     
     # 导入各词典
-    for dict_file, new_entries in by_dict.items():
+    for dict_file, new_words in by_dict.items():
         dict_path = dict_base / dict_file
         data, existing_words = load_existing_dict(dict_path)
         
         added = 0
-        for entry in new_entries:
-            word = entry["word"]
-            if word.lower() not in existing_words:
-                # 简化 entry，只保留必要字段
-                clean_entry = {
+        for word, conf in new_words:
+            word_lower = word.lower()
+            if word_lower not in existing_words:
+                # 只有真正添加的词才构建 entry，只保留必要字段
+                data["entries"].append({
                     "word": word,
-                    "confidence": entry["confidence"]
-                }
-                data["entries"].append(clean_entry)
-                existing_words.add(word.lower())
+                    "confidence": round(conf, 2)
+                })
+                existing_words.add(word_lower)
                 added += 1
         
         if added > 0:
@@ -182,7 +170,7 @@ def import_to_dicts(
 
 def main():
     if len(sys.argv) < 2:
-        print("用法: python import_ai_tags.py <test_results.json> [--dry-run]")
+        print("用法: python import_ai_tags.py <test_results.json|.jsonl> [--dry-run]")
         print("示例: python import_ai_tags.py test_results_ai.json --dry-run")
         sys.exit(1)
     
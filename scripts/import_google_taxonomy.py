@@ -12,13 +12,17 @@ Google Product Taxonomy 是 Google 官方的商品分类体系，
     en-US (英语), de-DE (德语), fr-FR (法语), 
     es-ES (西班牙语), ja-JP (日语), zh-CN (中文)
 """
-import json
 import re
 import sys
 import requests
 from pathlib import Path
 from collections import defaultdict
 
+# 添加项目根目录到 path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.json_io import read_json, write_json
+
 # 语言代码映射
 LANGUAGE_CODES = {
     'en': 'en-US',
@@ -71,6 +75,9 @@ SKIP_WORDS = {
            'その他', 'すべて', '新品', '中古', '一般', '特殊'},
 }
 
+# 分类名分词用的单词模式
+_WORD_PATTERN = re.compile(r'\b\w+\b')
+
 
 def download_taxonomy(lang_code: str, local_file: str = None) -> list:
     """下载或从本地加载 Google Product Taxonomy"""
@@ -99,10 +106,12 @@ def download_taxonomy(lang_code: str, local_file: str = None) -> list:
     print(f"   URL: {url}")
     
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        
-        categories = parse_taxonomy_content(response.text)
+        # 流式下载，边接收边逐行解析，不把整个文件读成一个字符串
+        with requests.get(url, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            if response.encoding is None:
+                response.encoding = 'utf-8'
+            categories = parse_taxonomy_lines(response.iter_lines(decode_unicode=True))
         print(f"   ✓ 下载成功，共 {len(categories)} 个分类")
         return categories
         
@@ -116,21 +125,28 @@ def download_taxonomy(lang_code: str, local_file: str = None) -> list:
 
 
 def parse_taxonomy_file(file_path: Path) -> list:
-    """解析本地 Taxonomy 文件"""
+    """解析本地 Taxonomy 文件（逐行读取）"""
     with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    return parse_taxonomy_content(content)
+        return parse_taxonomy_lines(f)
 
 
 def parse_taxonomy_content(content: str) -> list:
     """解析 Taxonomy 内容"""
-    lines = content.strip().split('\n')
+    return parse_taxonomy_lines(content.split('\n'))
+
+
+def parse_taxonomy_lines(lines) -> list:
+    """逐行解析 Taxonomy（第一个非空行为注释，跳过）"""
     categories = []
+    header_skipped = False
     
-    for line in lines[1:]:  # 跳过第一行注释
+    for line in lines:
         line = line.strip()
         if not line:
             continue
+        if not header_skipped:
+            header_skipped = True
+            continue
         
         # 格式1: "1 - Animals & Pet Supplies" (with IDs)
         if ' - ' in line and line.split(' - ')[0].strip().isdigit():
@@ -145,16 +161,19 @@ def parse_taxonomy_content(content: str) -> list:
 
 
 def extract_words(categories: list, lang: str) -> dict:
-    """从分类中提取词汇"""
-    product_words = defaultdict(lambda: {'count': 0, 'sources': []})
-    scenario_words = defaultdict(lambda: {'count': 0, 'sources': []})
+    """从分类中提取词汇（sources 为来源分类集合）"""
+    product_words = defaultdict(lambda: {'count': 0, 'sources': set()})
+    scenario_words = defaultdict(lambda: {'count': 0, 'sources': set()})
     
     skip = SKIP_WORDS.get(lang, SKIP_WORDS['en'])
     scenarios = SCENARIO_KEYWORDS.get(lang, SCENARIO_KEYWORDS['en'])
     
     for cat in categories:
-        # 分割层级
-        levels = cat.split(' > ')
+        # 分割层级（非日语整条分类只转一次小写）
+        if lang == 'ja':
+            levels = cat.split(' > ')
+        else:
+            levels = cat.lower().split(' > ')
         
         for level in levels:
             # 提取单词
@@ -163,7 +182,7 @@ def extract_words(categories: list, lang: str) -> dict:
                 words = [level]
             else:
                 # 其他语言：分词
-                words = re.findall(r'\b\w+\b', level.lower())
+                words = _WORD_PATTERN.findall(level)
             
             for word in words:
                 # 跳过条件
@@ -175,14 +194,9 @@ def extract_words(categories: list, lang: str) -> dict:
                     continue
                 
                 # 分类：场景词 or 商品词
-                if word in scenarios:
-                    scenario_words[word]['count'] += 1
-                    if cat not in scenario_words[word]['sources']:
-                        scenario_words[word]['sources'].append(cat)
-                else:
-                    product_words[word]['count'] += 1
-                    if cat not in product_words[word]['sources']:
-                        product_words[word]['sources'].append(cat)
+                info = scenario_words[word] if word in scenarios else product_words[word]
+                info['count'] += 1
+                info['sources'].add(cat)
     
     return {
         'products': dict(product_words),
@@ -195,8 +209,7 @@ def load_existing_dict(dict_path: Path) -> set:
     existing = set()
     
     if dict_path.exists():
-        with open(dict_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = read_json(dict_path)
         
         for entry in data.get('entries', []):
             word = entry.get('word', '').lower()
@@ -210,8 +223,7 @@ def merge_to_dict(dict_path: Path, new_words: dict, dry_run: bool = False) -> in
     """合并新词到词典"""
     # 加载现有词典
     if dict_path.exists():
-        with open(dict_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = read_json(dict_path)
     else:
         data = {'entries': []}
     
@@ -220,20 +232,20 @@ def merge_to_dict(dict_path: Path, new_words: dict, dry_run: bool = False) -> in
     # 添加新词
     added = 0
     for word, info in new_words.items():
-        if word.lower() not in existing:
+        word_lower = word.lower()
+        if word_lower not in existing:
             entry = {
                 'word': word,
                 'confidence': 0.85,  # Google Taxonomy 来源给 0.85
                 'source': 'google_taxonomy',
             }
             data['entries'].append(entry)
-            existing.add(word.lower())
+            existing.add(word_lower)
             added += 1
     
     # 保存
     if not dry_run and added > 0:
-        with open(dict_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        write_json(dict_path, data)
     
     return added
 
@@ -7,10 +7,14 @@
     
     不加 --apply 只预览，加了才真正写入
 """
-import json
 import sys
 from pathlib import Path
 
+# 添加项目根目录到 path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.json_io import read_json, write_json
+
 PROJECT_ROOT = Path(__file__).parent.parent
 DICT_PATH = PROJECT_ROOT / "dictionaries"
 
@@ -32,8 +36,7 @@ def safe_add_words(dict_file: Path, new_words: list, dry_run: bool = True) -> in
         return 0
     
     # 读取现有词典
-    with open(dict_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = read_json(dict_file)
     
     # 获取现有词（小写）
     existing = {entry.get('word', '').lower() for entry in data.get('entries', [])}
@@ -60,8 +63,7 @@ def safe_add_words(dict_file: Path, new_words: list, dry_run: bool = True) -> in
         data['entries'].extend(to_add)
         
         # 写回文件
-        with open(dict_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        write_json(dict_file, data)
         
         print(f"  ✅ 已添加 {len(to_add)} 个新词到 {dict_file.name}")
     
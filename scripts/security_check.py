@@ -5,12 +5,14 @@ GitHub 开源前安全检查脚本
 检查项目中是否包含敏感信息，确保可以安全开源
 
 使用方法:
-    python scripts/security_check.py
+    python scripts/security_check.py [-j workers]
 """
 import os
 import re
+import sys
 import json
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 
 PROJECT_ROOT = Path(__file__).parent.parent
 
@@ -33,6 +35,9 @@ SENSITIVE_PATTERNS = [
     (r'AKIA[0-9A-Z]{16}', 'AWS Access Key'),
 ]
 
+# 预编译的敏感信息模式（模块加载时编译一次）
+_COMPILED_PATTERNS = [(re.compile(p, re.IGNORECASE), d) for p, d in SENSITIVE_PATTERNS]
+
 # 敏感文件
 SENSITIVE_FILES = [
     '.env',
@@ -49,17 +54,48 @@ CHECK_EXTENSIONS = {'.py', '.json', '.yaml', '.yml', '.toml', '.ini', '.cfg', '.
 # 排除的目录
 EXCLUDE_DIRS = {'venv', 'env', '.venv', '__pycache__', '.git', 'node_modules', '.idea'}
 
+# 扫描文件内容时每次读取的字符数（小于此大小的文件一次读完）
+SCAN_CHUNK_SIZE = 1 << 20
+
+
+def iter_text_chunks(f, chunk_size: int = SCAN_CHUNK_SIZE):
+    """
+    分块读取文本文件，每块都截断在换行处
+    
+    不完整的最后一行留到下一块，单行内的匹配不会被切断。
+    没有换行的块先存入列表，等读到换行时一次拼接（避免反复拼接整个缓冲区），
+    因此超长行（如压缩后的 JSON）仍会整行读入内存。
+    """
+    pending = []  # 尚未遇到换行的文本片段
+    while True:
+        block = f.read(chunk_size)
+        if not block:
+            break
+        cut = block.rfind('\n') + 1
+        if cut == 0:
+            # 整块没有换行，继续累积
+            pending.append(block)
+            continue
+        pending.append(block[:cut])
+        yield ''.join(pending)
+        pending = [block[cut:]] if cut < len(block) else []
+    if pending:
+        yield ''.join(pending)
+
 
 def check_file_content(filepath: Path) -> list:
     """检查文件内容是否包含敏感信息"""
     issues = []
     
     try:
+        # 分块扫描，大文件不必整个读入内存
+        found = [[] for _ in _COMPILED_PATTERNS]
         with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
+            for chunk in iter_text_chunks(f):
+                for matches, (pattern, _) in zip(found, _COMPILED_PATTERNS):
+                    matches.extend(pattern.findall(chunk))
             
-        for pattern, description in SENSITIVE_PATTERNS:
-            matches = re.findall(pattern, content, re.IGNORECASE)
+        for matches, (_, description) in zip(found, _COMPILED_PATTERNS):
             if matches:
                 # 隐藏实际值
                 masked_matches = [m[:10] + '...' if len(m) > 10 else m for m in matches]
@@ -75,16 +111,39 @@ def check_file_content(filepath: Path) -> list:
     return issues
 
 
-def check_sensitive_files() -> list:
-    """检查是否存在敏感文件"""
+def walk_project():
+    """遍历项目中的文件（只遍历一次，不进入排除目录）"""
+    for dirpath, dirnames, filenames in os.walk(PROJECT_ROOT):
+        dirnames[:] = [d for d in dirnames if d not in EXCLUDE_DIRS]
+        for name in filenames:
+            yield Path(dirpath) / name
+
+
+def scan_file_contents(files: list, workers: int = 1):
+    """
+    依次扫描文件内容，按文件顺序产出每个文件的问题列表
+    
+    workers > 1 时用多进程并行扫描（正则匹配是 CPU 密集的）。
+    """
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(check_file_content, files, chunksize=32)
+    else:
+        yield from map(check_file_content, files)
+
+
+def check_sensitive_files(files: list = None) -> list:
+    """检查是否存在敏感文件（files 为 walk_project() 的结果，省略时自行遍历）"""
     issues = []
+    if files is None:
+        files = list(walk_project())
     
     for pattern in SENSITIVE_FILES:
         if '*' in pattern:
             # 通配符匹配
             ext = pattern.replace('*', '')
-            for filepath in PROJECT_ROOT.rglob(f'*{ext}'):
-                if not any(exc in filepath.parts for exc in EXCLUDE_DIRS):
+            for filepath in files:
+                if filepath.name.endswith(ext):
                     issues.append({
                         'file': str(filepath.relative_to(PROJECT_ROOT)),
                         'type': f'敏感文件类型: {pattern}',
@@ -147,6 +206,19 @@ def check_env_example() -> list:
 
 
 def main():
+    # 解析参数
+    workers = 1
+    for i, arg in enumerate(sys.argv):
+        if arg == '-j' and i + 1 < len(sys.argv):
+            try:
+                workers = int(sys.argv[i + 1])
+            except ValueError:
+                workers = 0
+            if workers < 1:
+                print(f"-j 需要正整数，收到: {sys.argv[i + 1]}")
+                print("用法: python scripts/security_check.py [-j workers]")
+                sys.exit(2)
+    
     print("=" * 60)
     print("🔒 GitHub 开源安全检查")
     print("=" * 60)
@@ -165,9 +237,12 @@ def main():
         print("  ✅ .gitignore 配置完整")
     print()
     
+    # 遍历一次项目文件，敏感文件检查和内容扫描共用
+    project_files = list(walk_project())
+    
     # 2. 检查敏感文件
     print("📁 检查敏感文件...")
-    issues = check_sensitive_files()
+    issues = check_sensitive_files(project_files)
     all_issues.extend(issues)
     if issues:
         for issue in issues:
@@ -189,16 +264,13 @@ def main():
     
     # 4. 扫描文件内容
     print("🔍 扫描代码中的敏感信息...")
-    file_count = 0
-    for filepath in PROJECT_ROOT.rglob('*'):
-        if filepath.is_file() and filepath.suffix in CHECK_EXTENSIONS:
-            if not any(exc in filepath.parts for exc in EXCLUDE_DIRS):
-                file_count += 1
-                issues = check_file_content(filepath)
-                all_issues.extend(issues)
-                if issues:
-                    for issue in issues:
-                        print(f"  ⚠️ {issue['file']}: {issue['type']}")
+    scan_files = [p for p in project_files if p.suffix in CHECK_EXTENSIONS]
+    file_count = len(scan_files)
+    for issues in scan_file_contents(scan_files, workers):
+        all_issues.extend(issues)
+        if issues:
+            for issue in issues:
+                print(f"  ⚠️ {issue['file']}: {issue['type']}")
     
     if not any(i.get('matches') for i in all_issues):
         print(f"  ✅ 已扫描 {file_count} 个文件，未发现敏感信息")
@@ -222,6 +294,5 @@ def main():
 
 
 if __name__ == "__main__":
-    import sys
     success = main()
     sys.exit(0 if success else 1)
@@ -9,6 +9,20 @@ from collections import defaultdict
 import threading
 
 
+# 词典名 -> 词典文件（相对词典目录）
+DICT_FILES = {
+    "brands": "brands/global.json",
+    "brands_zh": "brands/zh.json",
+    "brands_ja": "brands/ja.json",
+    "products": "products.json",
+    "audiences": "audiences.json",
+    "scenarios": "scenarios.json",
+    "colors": "colors.json",
+    "features": "features.json",
+    "attributes": "attributes.json",
+}
+
+
 class DictionaryManager:
     """词典管理器"""
     
@@ -18,6 +32,7 @@ class DictionaryManager:
         self._word_index: Dict[str, Set[str]] = defaultdict(set)  # word -> dict_names
         self._loaded = False
         self._lock = threading.Lock()
+        self._version = 0  # 每次词典内容变化时递增
     
     def load_all(self):
         """加载所有词典"""
@@ -26,19 +41,7 @@ class DictionaryManager:
             self._word_index = defaultdict(set)
             
             # 加载各类词典
-            dict_files = {
-                "brands": "brands/global.json",
-                "brands_zh": "brands/zh.json",
-                "brands_ja": "brands/ja.json",
-                "products": "products.json",
-                "audiences": "audiences.json",
-                "scenarios": "scenarios.json",
-                "colors": "colors.json",
-                "features": "features.json",
-                "attributes": "attributes.json",
-            }
-            
-            for dict_name, file_path in dict_files.items():
+            for dict_name, file_path in DICT_FILES.items():
                 full_path = self.dictionary_path / file_path
                 if full_path.exists():
                     self._load_dictionary(dict_name, full_path)
@@ -47,6 +50,7 @@ class DictionaryManager:
                     self._dictionaries[dict_name] = {"entries": []}
             
             self._loaded = True
+            self._version += 1
     
     def _load_dictionary(self, dict_name: str, file_path: Path):
         """加载单个词典文件"""
@@ -71,6 +75,11 @@ class DictionaryManager:
         """重新加载所有词典"""
         self.load_all()
     
+    @property
+    def version(self) -> int:
+        """词典内容版本号，加载/增删条目后递增，供下游缓存判断是否失效"""
+        return self._version
+    
     def is_loaded(self) -> bool:
         """检查词典是否已加载"""
         return self._loaded
@@ -168,20 +177,71 @@ class DictionaryManager:
         source: str = "manual"
     ):
         """添加词典条目"""
+        dict_name, added = self._upsert_entry(word, tag, language, confidence, source)
+        
+        # 保存到文件
+        if added:
+            self._save_dictionary(dict_name)
+    
+    def add_entries(self, entries: List[Dict]):
+        """
+        批量添加词典条目，每个受影响的词典文件（含仅更新了已有条目的）只写一次
+        
+        Args:
+            entries: [{"word": ..., "tag": ..., "language"?: ..., "confidence"?: ...,
+                       "source"?: ..., "dict_name"?: ...}]
+                     给出 dict_name 时直接写入该词典，否则按 tag/language 推断
+        """
+        changed = set()
+        for entry in entries:
+            dict_name, _ = self._upsert_entry(
+                entry["word"],
+                entry["tag"],
+                entry.get("language", "global"),
+                entry.get("confidence", 1.0),
+                entry.get("source", "manual"),
+                entry.get("dict_name"),
+            )
+            changed.add(dict_name)
+        
+        # 保存到文件
+        for dict_name in changed:
+            self._save_dictionary(dict_name)
+    
+    def _upsert_entry(
+        self,
+        word: str,
+        tag: str,
+        language: str,
+        confidence: float,
+        source: str,
+        dict_name: Optional[str] = None
+    ):
+        """
+        在内存中添加或更新条目，不写文件
+        
+        _word_index 与 _dictionaries 始终同步更新，索引中没有的词即不在该词典中。
+        
+        Returns:
+            (词典名, 是否新增)
+        """
         # 确定目标词典
-        dict_name = self._get_dict_name_for_tag(tag, language)
+        if dict_name is None:
+            dict_name = self._get_dict_name_for_tag(tag, language)
         
         if dict_name not in self._dictionaries:
             self._dictionaries[dict_name] = {"entries": []}
         
-        # 检查是否已存在
+        # 检查是否已存在（索引中没有该词典时必然不存在，不必逐条扫描）
         word_lower = word.lower()
-        for entry in self._dictionaries[dict_name].get("entries", []):
-            if entry.get("word", "").lower() == word_lower:
-                # 更新现有条目
-                entry["confidence"] = confidence
-                entry["source"] = source
-                return
+        if dict_name in self._word_index.get(word_lower, ()):
+            for entry in self._dictionaries[dict_name].get("entries", []):
+                if entry.get("word", "").lower() == word_lower:
+                    # 更新现有条目
+                    entry["confidence"] = confidence
+                    entry["source"] = source
+                    self._version += 1
+                    return dict_name, False
         
         # 添加新条目
         new_entry = {
@@ -189,13 +249,12 @@ class DictionaryManager:
             "confidence": confidence,
             "source": source
         }
-        self._dictionaries[dict_name]["entries"].append(new_entry)
+        self._dictionaries[dict_name].setdefault("entries", []).append(new_entry)
         
         # 更新索引
         self._word_index[word_lower].add(dict_name)
-        
-        # 保存到文件
-        self._save_dictionary(dict_name)
+        self._version += 1
+        return dict_name, True
     
     def remove_entry(self, word: str, tag: str):
         """删除词典条目"""
@@ -213,6 +272,7 @@ class DictionaryManager:
         # 更新索引
         if word_lower in self._word_index:
             self._word_index[word_lower].discard(dict_name)
+        self._version += 1
         
         # 保存到文件
         self._save_dictionary(dict_name)
@@ -241,22 +301,10 @@ class DictionaryManager:
     def _save_dictionary(self, dict_name: str):
         """保存词典到文件"""
         # 确定文件路径
-        file_mapping = {
-            "brands": "brands/global.json",
-            "brands_zh": "brands/zh.json",
-            "brands_ja": "brands/ja.json",
-            "products": "products.json",
-            "audiences": "audiences.json",
-            "scenarios": "scenarios.json",
-            "colors": "colors.json",
-            "features": "features.json",
-            "attributes": "attributes.json",
-        }
-        
-        if dict_name not in file_mapping:
+        if dict_name not in DICT_FILES:
             return
         
-        file_path = self.dictionary_path / file_mapping[dict_name]
+        file_path = self.dictionary_path / DICT_FILES[dict_name]
         
         # 确保目录存在
         file_path.parent.mkdir(parents=True, exist_ok=True)
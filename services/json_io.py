@@ -0,0 +1,117 @@
+"""
+JSON 读写工具
+
+scripts/ 与 dict_expansion/ 下的脚本共用（orjson / ijson 可选）
+"""
+import json
+import os
+from pathlib import Path
+
+# orjson（可选）：读写更快
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ijson（可选）：流式解析结果文件，不必把整个文件读入内存
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# 读写大文件时的缓冲区大小
+IO_BUFFER_SIZE = 1 << 20
+
+
+def loads_json(text):
+    """解析 JSON 字符串或字节串"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def read_json(path: Path):
+    """读取 JSON 文件"""
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_json(path: Path, data, non_str_keys: bool = False):
+    """
+    写入 JSON 文件（缩进 2，保留非 ASCII 字符）
+    
+    先写同目录下的临时文件、fsync 落盘后再 os.replace，
+    中途出错或断电都不会留下写了一半的文件。所有脚本的 JSON 写入都走这里。
+    
+    有 orjson 时用 orjson 序列化，普通数据的输出与 json.dump(ensure_ascii=False, indent=2) 相同；
+    但 NaN/Infinity 会写成 null（json 写出非标准的 NaN/Infinity）。
+    
+    Args:
+        non_str_keys: 允许 dict 使用非字符串键（如统计信息中的置信度），
+            写出时转为字符串；json.dump 默认即如此，只影响 orjson
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        if orjson is not None:
+            option = orjson.OPT_INDENT_2
+            if non_str_keys:
+                option |= orjson.OPT_NON_STR_KEYS
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(data, option=option))
+                f.flush()
+                os.fsync(f.fileno())
+        else:
+            # json.dump 会分成大量小片段写入，加大缓冲区减少系统调用
+            with open(tmp_path, 'w', encoding='utf-8', buffering=IO_BUFFER_SIZE) as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def _is_jsonl(results_path) -> bool:
+    """
+    按内容判断结果文件是否为 JSONL（不看扩展名，batch_test_v2 -o x.json --jsonl 也会写出 JSONL）
+    
+    第一个非空行本身就是一个不含 "results" 键的 JSON 对象时视为 JSONL；
+    write_json 写出的缩进 JSON 第一行只有 "{"，解析失败即为整份 JSON 文档。
+    """
+    with open(results_path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                break
+        else:
+            return True  # 空文件没有结果，按 JSONL 逐行读取即可
+    try:
+        first = loads_json(line)
+    except ValueError:
+        return False
+    return isinstance(first, dict) and 'results' not in first
+
+
+def iter_results(results_path):
+    """
+    逐条读取测试结果文件中的 results
+    
+    支持 batch_test 输出的 JSON（{"results": [...]}）和 batch_test_v2 --jsonl 输出的 JSONL（每行一条结果），
+    格式按文件内容判断。
+    """
+    if _is_jsonl(results_path):
+        with open(results_path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield loads_json(line)
+        return
+    
+    if ijson is not None:
+        with open(results_path, 'rb') as f:
+            yield from ijson.items(f, 'results.item', use_float=True)
+        return
+    
+    yield from read_json(results_path).get('results', [])
@@ -0,0 +1,41 @@
+"""
+批量测试脚本 V2 测试
+"""
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+# 添加项目根目录和 scripts 目录到 path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+pytest.importorskip("jieba")
+
+from config import settings
+from core.enhanced_pipeline import EnhancedPipeline
+from services.dictionary_manager import DictionaryManager
+from batch_test_v2 import phase1_collect_low_conf
+
+
+class TestPhase1:
+    """阶段1处理测试"""
+
+    @pytest.fixture(scope="class")
+    def pipeline(self):
+        dm = DictionaryManager(settings.dictionary_path)
+        dm.load_all()
+        return EnhancedPipeline(dm, enable_ai=False)
+
+    def test_workers_match_single_process(self, pipeline):
+        """多进程处理中文关键词不会卡住，结果与单进程一致"""
+        keywords = [
+            {'keyword': '华为手机壳', 'language': '中文'},
+            {'keyword': '无线蓝牙耳机', 'language': '中文'},
+            {'keyword': '华为手机壳', 'language': '中文'},
+        ]
+        expected, _, _ = asyncio.run(phase1_collect_low_conf(pipeline, keywords))
+        results, _, _ = asyncio.run(phase1_collect_low_conf(pipeline, keywords, workers=2))
+
+        assert [r['tokens'] for r in results] == [r['tokens'] for r in expected]
+        assert all('error' not in r for r in results)
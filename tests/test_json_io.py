@@ -0,0 +1,35 @@
+"""
+JSON 读写工具测试
+"""
+import json
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.json_io import iter_results, write_json
+
+
+class TestIterResults:
+    """结果文件读取测试"""
+
+    RESULTS = [{'keyword': 'a', 'tokens': ['a']}, {'keyword': 'b', 'tokens': ['b']}]
+
+    def test_json_document(self, tmp_path):
+        path = tmp_path / "out.json"
+        write_json(path, {'statistics': {}, 'results': self.RESULTS})
+        assert list(iter_results(path)) == self.RESULTS
+
+    def test_jsonl_with_json_suffix(self, tmp_path):
+        """--jsonl 写到 .json 路径时按内容识别为 JSONL"""
+        path = tmp_path / "out.json"
+        path.write_text(
+            "".join(json.dumps(r) + "\n" for r in self.RESULTS), encoding="utf-8"
+        )
+        assert list(iter_results(path)) == self.RESULTS
+
+    def test_single_line_json_document(self, tmp_path):
+        path = tmp_path / "out.jsonl"
+        path.write_text(json.dumps({'results': self.RESULTS}), encoding="utf-8")
+        assert list(iter_results(path)) == self.RESULTS
@@ -1,6 +1,8 @@
 """
 分词功能测试
 """
+import json
+import shutil
 import pytest
 import sys
 from pathlib import Path
@@ -90,5 +92,81 @@ class TestDictionaryManager:
         assert dict_manager.contains("brands", "小米")
 
 
+
+class TestDictionaryManagerBulkUpdate:
+    """词典批量更新测试（在临时目录的词典副本上进行）"""
+    
+    @pytest.fixture
+    def dict_manager(self, tmp_path, monkeypatch):
+        """创建使用词典副本的管理器，并记录每次保存的词典名"""
+        shutil.copytree(Path(__file__).parent.parent / "dictionaries", tmp_path / "dictionaries")
+        dm = DictionaryManager(tmp_path / "dictionaries")
+        dm.load_all()
+        
+        dm.saved = []
+        save = dm._save_dictionary
+        
+        def record_save(dict_name):
+            dm.saved.append(dict_name)
+            save(dict_name)
+        
+        monkeypatch.setattr(dm, "_save_dictionary", record_save)
+        return dm
+    
+    def _count(self, dm, dict_name, word):
+        return sum(
+            1 for e in dm.get_entries(dict_name)
+            if e.get("word", "").lower() == word.lower()
+        )
+    
+    def test_insert_and_update_save_each_dictionary_once(self, dict_manager):
+        """测试新增与更新混合时，每个受影响的词典只保存一次（含仅更新的词典）"""
+        dict_manager.add_entries([
+            {"word": "trailfoo", "tag": "商品词", "confidence": 0.8},
+            {"word": "trailbar", "tag": "商品词", "confidence": 0.8},
+            {"word": "Nike", "tag": "品牌词", "confidence": 0.5, "source": "ai_generated"},
+        ])
+        
+        assert sorted(dict_manager.saved) == ["brands", "products"]
+        assert self._count(dict_manager, "products", "trailfoo") == 1
+        assert self._count(dict_manager, "brands", "nike") == 1
+        assert dict_manager.get_entry("brands", "nike")["source"] == "ai_generated"
+    
+    def test_dict_name_routes_japanese_brand(self, dict_manager, tmp_path):
+        """测试指定 dict_name 时日语品牌词写入 brands_ja"""
+        dict_manager.add_entries([
+            {"word": "トレイルフー", "tag": "品牌词", "dict_name": "brands_ja"},
+        ])
+        
+        assert dict_manager.saved == ["brands_ja"]
+        assert self._count(dict_manager, "brands_ja", "トレイルフー") == 1
+        saved = json.loads(
+            (tmp_path / "dictionaries" / "brands" / "ja.json").read_text(encoding="utf-8")
+        )
+        assert any(e["word"] == "トレイルフー" for e in saved["entries"])
+    
+    def test_same_word_in_different_dictionaries(self, dict_manager):
+        """测试同一个词可分别进入不同词典，重复添加不会产生重复条目"""
+        entries = [
+            {"word": "trailfoo", "tag": "商品词"},
+            {"word": "trailfoo", "tag": "品牌词"},
+        ]
+        dict_manager.add_entries(entries)
+        dict_manager.add_entries(entries)
+        
+        assert self._count(dict_manager, "products", "trailfoo") == 1
+        assert self._count(dict_manager, "brands", "trailfoo") == 1
+    
+    def test_index_stays_in_sync_after_remove(self, dict_manager):
+        """测试删除后重新添加不会产生重复条目"""
+        dict_manager.add_entries([{"word": "trailfoo", "tag": "商品词"}])
+        dict_manager.remove_entry("trailfoo", "商品词")
+        assert self._count(dict_manager, "products", "trailfoo") == 0
+        
+        dict_manager.add_entries([{"word": "trailfoo", "tag": "商品词"}])
+        dict_manager.add_entries([{"word": "TrailFoo", "tag": "商品词"}])
+        assert self._count(dict_manager, "products", "trailfoo") == 1
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
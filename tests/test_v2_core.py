@@ -0,0 +1,138 @@
+"""
+v2 核心模块测试
+"""
+import pytest
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.script_segmenter import ScriptSegmenter, ScriptType
+from core.phrase_merger import PhraseMerger
+from core.span_extractor import SpanPhraseExtractor, SpanType
+from core.spanish_normalizer import SpanishNormalizer
+
+
+class TestScriptSegmenter:
+    """脚本分段器测试"""
+    
+    def test_segment_mixed(self):
+        """测试混合脚本分段"""
+        segments = ScriptSegmenter().segment("Nike ランニングシューズ 26.5cm")
+        assert [(s.text, s.script) for s in segments] == [
+            ("Nike", ScriptType.LATIN),
+            ("ランニングシューズ", ScriptType.KANA),
+            ("26.5cm", ScriptType.LATIN),
+        ]
+    
+    def test_segment_text_is_source_slice(self):
+        """测试分段文本与原文位置一致"""
+        text = "New Balance跑步鞋男士黑色10.5码"
+        for seg in ScriptSegmenter().segment(text):
+            assert seg.text == text[seg.start:seg.end]
+    
+    def test_merged_gap_whitespace_is_normalized(self):
+        """测试合并段间的全角空格、制表符、NBSP 规范为普通空格"""
+        for text in ("New\u3000Balance跑步鞋", "New\tBalance 鞋", "New\xa0Balance"):
+            assert ScriptSegmenter().segment(text)[0].text == "New Balance"
+
+
+
+class TestPhraseMerger:
+    """短语合并器测试"""
+    
+    def setup_method(self):
+        self.merger = PhraseMerger()
+    
+    def test_merge_longest_phrase(self):
+        """测试优先合并最长短语"""
+        tokens = ["Steering", "wheel", "cover", "plus", "size", "women"]
+        assert self.merger.merge_to_strings(tokens) == [
+            "Steering wheel cover", "plus size women"
+        ]
+    
+    def test_merge_non_ascii_phrase(self):
+        """测试非 ASCII 短语（走逐位置匹配路径）"""
+        merged = self.merger.merge(["sac", "à", "dos", "noir"])
+        assert [m.text for m in merged] == ["sac à dos", "noir"]
+        assert merged[0].suggested_tag == "商品词"
+    
+    def test_added_phrase_is_matched(self):
+        """测试新增短语在后续合并中生效"""
+        self.merger.add_phrase(("rash", "guard"), "商品词", 0.95)
+        assert self.merger.merge_to_strings(["rash", "guard", "kids"]) == [
+            "rash guard", "kids"
+        ]
+
+
+
+class TestSpanPhraseExtractor:
+    """Span 固定短语提取器测试"""
+    
+    def setup_method(self):
+        self.extractor = SpanPhraseExtractor()
+        self.extractor.add_phrase("new balance", "品牌词", 0.95, SpanType.BRAND)
+        self.extractor.add_phrase("nike", "品牌词", 0.95, SpanType.BRAND)
+        self.extractor.add_phrase("one", "属性词", 0.9)
+        self.extractor.add_phrase("跑步鞋", "商品词", 0.9)
+    
+    def test_extract_longest_and_number_unit(self):
+        """测试最长匹配与数字+单位提取"""
+        spans, locked = self.extractor.extract("New Balance跑步鞋男士黑色10.5码")
+        assert [(s.text, s.tag) for s in spans] == [
+            ("New Balance", "品牌词"), ("跑步鞋", "商品词"), ("10.5码", "尺寸词")
+        ]
+        assert locked == [(0, 11), (11, 14), (18, 23)]
+    
+    def test_extract_respects_word_boundary(self):
+        """测试不匹配词内部的子串"""
+        spans, _ = self.extractor.extract("someone bought one nike shirt")
+        assert [(s.text, s.start) for s in spans] == [("one", 15), ("nike", 19)]
+
+    def test_extract_batch_reuses_duplicates(self):
+        """测试批量提取与逐条提取一致，重复文本拿到独立的列表"""
+        texts = ["nike跑步鞋", "new balance", "nike跑步鞋"]
+        results = self.extractor.extract_batch(texts)
+        assert results == [self.extractor.extract(text) for text in texts]
+        assert results[0][0] is not results[2][0]
+
+
+
+class TestSpanishNormalizer:
+    """西班牙语词形归一化测试"""
+    
+    def setup_method(self):
+        self.normalizer = SpanishNormalizer({'canción', 'camiseta'})
+    
+    def test_plural_and_gender(self):
+        """测试复数还原与性别归一"""
+        assert self.normalizer.normalize('canciones').normalized == 'canción'
+        assert self.normalizer.normalize('Camisetas').normalized == 'camiseta'
+        result = self.normalizer.normalize('negras')
+        assert result.normalized == 'negro'
+        assert result.changes == ['s→∅(unverified)', 'a→o']
+    
+    def test_no_normalize_keeps_original(self):
+        """测试不归一化的词保留原样"""
+        result = self.normalizer.normalize('Lunes')
+        assert result.normalized == 'Lunes'
+        assert result.changes == []
+    
+    def test_dictionary_update_invalidates_cache(self):
+        """测试词典更新后归一化结果随之更新"""
+        assert self.normalizer.normalize('profesora').normalized == 'profesora'
+        self.normalizer.add_to_dictionary(['profesor'])
+        assert self.normalizer.normalize('profesora').normalized == 'profesor'
+
+    def test_set_dictionary_copies_words(self):
+        """测试修改传入的集合不影响已设置的词典"""
+        words = {'profesor'}
+        self.normalizer.set_dictionary(words)
+        assert self.normalizer.normalize('profesora').normalized == 'profesor'
+        words.clear()
+        assert self.normalizer.normalize('profesora').normalized == 'profesor'
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])